@@ -3,6 +3,7 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import type { Logger } from '../utils/logger.js';
 import { createRealTaskTool } from './tool.create_real_task.js';
 import { deployHeadlessAgentTool } from './tool.deploy_headless_agent.js';
+import { deployHeadlessAgentsBatchTool } from './tool.deploy_headless_agents_batch.js';
 import { getRealTaskStatusTool } from './tool.get_real_task_status.js';
 import { killRealAgentTool } from './tool.kill_real_agent.js';
 import { getAgentOutputTool } from './tool.get_agent_output.js';
@@ -29,6 +30,7 @@ export function getToolRegistry(logger: Logger): ToolRegistry {
   const tools: RegisteredTool<unknown>[] = [
     createRealTaskTool(logger) as RegisteredTool<unknown>,
     deployHeadlessAgentTool(logger) as RegisteredTool<unknown>,
+    deployHeadlessAgentsBatchTool(logger) as RegisteredTool<unknown>,
     getRealTaskStatusTool(logger) as RegisteredTool<unknown>,
     killRealAgentTool(logger) as RegisteredTool<unknown>,
     getAgentOutputTool(logger) as RegisteredTool<unknown>,
@@ -1,12 +1,13 @@
 import { z } from 'zod';
 import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
-import { ensureDir, readJsonFile, writeJsonFile } from '../utils/fs.js';
+import { ensureDir, readJsonFile, withFileLock, writeJsonFile } from '../utils/fs.js';
 import { ensureWorkspace, resolveWorkspaceBase } from '../utils/workspace.js';
 import { getEnv } from '../types/env.js';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
 import { expandPath } from '../utils/pathutil.js';
+import { calculateTaskComplexity } from '../utils/complexity.js';
 
 export const createRealTaskSchema = z.object({
   description: z.string().min(1),
@@ -37,22 +38,23 @@ export function createRealTaskTool(logger: Logger): RegisteredTool<CreateRealTas
         ? path.join(callerDir, '.agent-workspace')
         : requestedBase;
 
-      const taskId = `TASK-${new Date().toISOString().replace(/[-:T.Z]/g, '').slice(0, 15)}-${Math.random().toString(16).slice(2, 10)}`;
+      // One timestamp per request; reused for the id and every created_at below
+      const nowIso = new Date().toISOString();
+      const taskId = `TASK-${nowIso.replace(/[-:T.Z]/g, '').slice(0, 15)}-${Math.random().toString(16).slice(2, 10)}`;
       const workspace = path.join(base, taskId);
 
-      await ensureDir(path.join(workspace, 'progress'));
-      await ensureDir(path.join(workspace, 'logs'));
-      await ensureDir(path.join(workspace, 'findings'));
-      await ensureDir(path.join(workspace, 'output'));
+      // One concurrent mkdir batch; recursive creation covers the fresh workspace itself
       const contextDir = path.join(workspace, 'context');
-      await ensureDir(contextDir);
+      await Promise.all(
+        ['progress', 'logs', 'findings', 'output', 'context'].map((d) => ensureDir(path.join(workspace, d))),
+      );
 
       const taskGuidance = `TASK GUIDANCE\n\nWorkspace: ${workspace}\nCaller CWD: ${callerDir}\n\nWhen creating orchestrator tasks from this project, pass:\n- workspace_base=\"${callerDir}/.agent-workspace\"\n- caller_cwd=\"${callerDir}\"\n\nAgents should:\n- Use regular providers in use cases (no realtime)\n- Keep filters stable (never create maps in build)\n- Use generated providers directly; compose, don’t wrap\n- Treat MFC and Velocity Profile as separate methods\n\nSupabase MCP: project_id=xvhvkekbwesdaotcuwyh\nClaude headless model: claude-sonnet-4-20250514\n`;
 
       await writeJsonFile(path.join(workspace, 'AGENT_REGISTRY.json'), {
         task_id: taskId,
         task_description: input.description,
-        created_at: new Date().toISOString(),
+        created_at: nowIso,
         workspace,
         workspace_base: base,
         caller_cwd: callerDir,
@@ -75,7 +77,7 @@ export function createRealTaskTool(logger: Logger): RegisteredTool<CreateRealTas
         },
         spiral_checks: {
           enabled: true,
-          last_check: new Date().toISOString(),
+          last_check: nowIso,
           violations: 0,
         },
       });
@@ -86,29 +88,33 @@ export function createRealTaskTool(logger: Logger): RegisteredTool<CreateRealTas
       await fs.promises.writeFile(guidancePath, taskGuidance, 'utf-8');
 
       const globalPath = path.join(resolveWorkspaceBase(), 'registry', 'GLOBAL_REGISTRY.json');
-      const globalReg = await readJsonFile<Record<string, any>>(globalPath, {
-        created_at: new Date().toISOString(),
-        total_tasks: 0,
-        active_tasks: 0,
-        total_agents_spawned: 0,
-        active_agents: 0,
-        max_concurrent_agents: Number(process.env.codex_ORCHESTRATOR_MAX_CONCURRENT ?? '8'),
-        tasks: {},
-        agents: {},
+      // Lock the read-modify-write so concurrent task creations can't drop
+      // each other's counter increments or task entries
+      await withFileLock(globalPath, async () => {
+        const globalReg = await readJsonFile<Record<string, any>>(globalPath, {
+          created_at: nowIso,
+          total_tasks: 0,
+          active_tasks: 0,
+          total_agents_spawned: 0,
+          active_agents: 0,
+          max_concurrent_agents: Number(process.env.codex_ORCHESTRATOR_MAX_CONCURRENT ?? '8'),
+          tasks: {},
+          agents: {},
+        });
+        globalReg.tasks = globalReg.tasks || {};
+        globalReg.total_tasks = (globalReg.total_tasks || 0) + 1;
+        globalReg.active_tasks = (globalReg.active_tasks || 0) + 1;
+        globalReg.tasks[taskId] = {
+          description: input.description,
+          created_at: nowIso,
+          status: 'INITIALIZED',
+          workspace,
+          workspace_base: base,
+          caller_cwd: callerDir,
+          guidance: taskGuidance,
+        };
+        await writeJsonFile(globalPath, globalReg);
       });
-      globalReg.tasks = globalReg.tasks || {};
-      globalReg.total_tasks = (globalReg.total_tasks || 0) + 1;
-      globalReg.active_tasks = (globalReg.active_tasks || 0) + 1;
-      globalReg.tasks[taskId] = {
-        description: input.description,
-        created_at: new Date().toISOString(),
-        status: 'INITIALIZED',
-        workspace,
-        workspace_base: base,
-        caller_cwd: callerDir,
-        guidance: taskGuidance,
-      };
-      await writeJsonFile(globalPath, globalReg);
 
       const response = {
         success: true,
@@ -129,41 +135,4 @@ export function createRealTaskTool(logger: Logger): RegisteredTool<CreateRealTas
   };
 }
 
-function calculateTaskComplexity(description: string): number {
-  const complexityKeywords: Record<string, number> = {
-    comprehensive: 5,
-    complete: 4,
-    full: 4,
-    entire: 4,
-    system: 3,
-    platform: 3,
-    application: 3,
-    website: 2,
-    frontend: 2,
-    backend: 2,
-    database: 2,
-    api: 2,
-    testing: 2,
-    security: 2,
-    performance: 2,
-    optimization: 2,
-    deployment: 2,
-    'ci/cd': 2,
-    monitoring: 2,
-    analytics: 2,
-    authentication: 2,
-    authorization: 2,
-    integration: 2,
-  };
-  let score = 1;
-  const lower = description.toLowerCase();
-  for (const [k, v] of Object.entries(complexityKeywords)) {
-    if (lower.includes(k)) score += v;
-  }
-  if (description.length > 200) score += 2;
-  if (lower.includes('layers') || lower.includes('multi')) score += 3;
-  if (lower.includes('specialist') || lower.includes('expert')) score += 2;
-  return Math.min(score, 20);
-}
-
 
@@ -3,12 +3,36 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile, writeJsonFile } from '../utils/fs.js';
-import { checkTmuxAvailable, createTmuxSession } from '../utils/tmux.js';
+import { appendTaskEvent, getAgentById, getTaskRegistry, saveTaskCounters, scheduleRegistrySave } from '../utils/registry.js';
+import { resolveEphemeralDir } from '../utils/workspace.js';
+import { ensureDirOnce } from '../utils/fs.js';
+import { checkTmuxAvailable, createTmuxSession, waitForTmuxSession } from '../utils/tmux.js';
 import { getAppendPromptSnippet } from '../utils/prompt.js';
+import { calculateTaskComplexity, generateSpecializationRecommendations } from '../utils/complexity.js';
 import { getEnv } from '../types/env.js';
 
+// Static template for the shell logging instructions appended to every agent
+// prompt, rendered once at module load instead of re-interpolated per spawn.
+// Placeholders are %NAME% tokens because the body itself contains shell
+// $(...) / ${...} expansions that must reach the agent verbatim.
+const LOGGING_INSTRUCTIONS_TPL = `\n\nーーー\nPROGRESS & FINDINGS LOGGING (Required)\n\nWrite concise JSONL entries regularly so orchestration can track you.\n\n- Progress file: %PROGRESS_FILE%\n- Findings file: %FINDINGS_FILE%\n\nProgress entry (example):\n{"timestamp":"$(date -Iseconds)","agent_id":"%AGENT_ID%","status":"working","message":"<what you are doing>","progress":10}\nShell command:\nexport _now="$(date -Iseconds)"; echo '{"timestamp":"'"'"\${_now}"'"'","agent_id":"%AGENT_ID%","status":"working","message":"<what you are doing>","progress":10}' >> "%PROGRESS_FILE%"\n\nFinding entry (example):\n{"timestamp":"$(date -Iseconds)","agent_id":"%AGENT_ID%","finding_type":"<type>","severity":"low|medium|high|critical","message":"<summary>","data":{}}\nShell command:\nexport _now="$(date -Iseconds)"; echo '{"timestamp":"'"'"\${_now}"'"'","agent_id":"%AGENT_ID%","finding_type":"<type>","severity":"low","message":"<summary>","data":{}}' >> "%FINDINGS_FILE%"`;
+
+function renderLoggingInstructions(agentId: string, progressFile: string, findingsFile: string): string {
+  // Function replacements: string patterns would interpret $-sequences
+  // ($&, $\`, $', $$) occurring in ids or paths as substitution directives
+  return LOGGING_INSTRUCTIONS_TPL.replaceAll('%AGENT_ID%', () => agentId)
+    .replaceAll('%PROGRESS_FILE%', () => progressFile)
+    .replaceAll('%FINDINGS_FILE%', () => findingsFile);
+}
+
+// Identity header of the agent prompt; the mission is substituted last so
+// tokens occurring in user-supplied prompt text are never re-expanded
+const AGENT_IDENTITY_TPL = `You are a headless codex agent in an orchestrator system.\n\nAGENT IDENTITY:\n- Agent ID: %AGENT_ID%\n- Agent Type: %AGENT_TYPE%\n- Task ID: %TASK_ID%\n- Parent Agent: %PARENT%\n- Depth Level: %DEPTH%\n- Workspace: %WORKSPACE%\n\nMISSION:\n%MISSION%`;
+
+// Strategy/naming/criteria guidance is identical for every spawn apart from
+// the recommended child count
+const GUIDANCE_TAIL_TPL = `\n\n🚀 ORCHESTRATION STRATEGY:\n1. ANALYZE if your task benefits from specialization\n2. SPAWN %CHILD_COUNT% with focused, specific roles\n3. COORDINATE their work efficiently\n4. Each child should handle a distinct domain\n\n💡 NAMING CONVENTION: Use clear, descriptive names:\n   - 'css_responsive_specialist' not just 'css'\n   - 'api_authentication_handler' not just 'auth'\n   - 'database_optimization_expert' not just 'db'\n\n⭐ SUCCESS CRITERIA: Balance specialization with efficiency:\n   - Spawn specialists only when beneficial\n   - Coordinate effectively without micro-management\n   - Deliver comprehensive, integrated results`;
+
 export const deployHeadlessAgentSchema = z.object({
   task_id: z.string().min(1),
   agent_type: z.string().min(1),
@@ -30,9 +54,8 @@ export function deployHeadlessAgentTool(logger: Logger): RegisteredTool<DeployHe
       if (!(await checkTmuxAvailable())) {
         return [{ type: 'text', text: JSON.stringify({ success: false, error: 'tmux is not available - required for background execution' }) }];
       }
-      const { workspace, registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
-      const registry = await readJsonFile<any>(registryPath, {});
+      const { workspace, registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
 
       const active = Number(registry.active_count || 0);
       const maxConcurrent = Number(registry.max_concurrent ?? process.env.codex_ORCHESTRATOR_MAX_CONCURRENT ?? '8');
@@ -45,22 +68,40 @@ export function deployHeadlessAgentTool(logger: Logger): RegisteredTool<DeployHe
         return [{ type: 'text', text: JSON.stringify({ success: false, error: `Max agents reached (${totalSpawned}/${maxAgents})` }) }];
       }
 
-      const agentId = `${input.agent_type}-${new Date().toISOString().replace(/[-:T.Z]/g, '').slice(8, 14)}-${Math.random().toString(16).slice(2, 8)}`;
+      // Reserve the slot before the first await: batched deploys all pass the
+      // checks above before any spawn completes, so counting only on success
+      // would let a burst overshoot both limits. Failures roll the counters
+      // back below.
+      registry.total_spawned = totalSpawned + 1;
+      registry.active_count = active + 1;
+      const rollbackReservation = () => {
+        registry.total_spawned = Math.max(0, Number(registry.total_spawned || 0) - 1);
+        registry.active_count = Math.max(0, Number(registry.active_count || 0) - 1);
+      };
+
+      const nowIso = new Date().toISOString();
+      const agentId = `${input.agent_type}-${nowIso.replace(/[-:T.Z]/g, '').slice(8, 14)}-${Math.random().toString(16).slice(2, 8)}`;
       const sessionName = `agent_${agentId}`;
 
       let depth = input.parent === 'orchestrator' ? 1 : 2;
-      for (const a of registry.agents || []) {
-        if (a.id === input.parent) {
-          depth = Number(a.depth || 1) + 1;
-          break;
-        }
-      }
+      const parentAgent = getAgentById(registry, input.parent);
+      if (parentAgent) depth = Number(parentAgent.depth || 1) + 1;
 
       const taskDescription = String(registry.task_description ?? '');
       const maxDepth = Number(registry.max_depth ?? process.env.codex_ORCHESTRATOR_MAX_DEPTH ?? '5');
       const orchestrationPrompt = createOrchestrationGuidancePrompt(input.agent_type, taskDescription, depth, maxDepth);
 
-      let agentPrompt = `You are a headless codex agent in an orchestrator system.\n\nAGENT IDENTITY:\n- Agent ID: ${agentId}\n- Agent Type: ${input.agent_type}\n- Task ID: ${input.task_id}\n- Parent Agent: ${input.parent}\n- Depth Level: ${depth}\n- Workspace: ${workspace}\n\nMISSION:\n${input.prompt}\n\n${orchestrationPrompt}\n`;
+      // Function replacements throughout: caller-supplied values (the mission
+      // especially, but also types/paths) may contain $-sequences that string
+      // patterns would expand into slices of the template
+      let agentPrompt =
+        AGENT_IDENTITY_TPL.replaceAll('%AGENT_ID%', () => agentId)
+          .replaceAll('%AGENT_TYPE%', () => input.agent_type)
+          .replaceAll('%TASK_ID%', () => input.task_id)
+          .replaceAll('%PARENT%', () => input.parent)
+          .replaceAll('%DEPTH%', () => String(depth))
+          .replaceAll('%WORKSPACE%', () => workspace)
+          .replace('%MISSION%', () => input.prompt) + `\n\n${orchestrationPrompt}\n`;
       const taskGuidance: string | undefined = registry.guidance;
       if (taskGuidance) agentPrompt += `\n\nーーー\nTASK GUIDANCE (Auto-Included)\n\n${taskGuidance}`;
       const alwaysEnabled = String(process.env.codex_ORCHESTRATOR_ALWAYS_WORKS_ENABLED ?? '1').toLowerCase() in { '1': 1, true: 1, yes: 1, on: 1 };
@@ -74,11 +115,13 @@ export function deployHeadlessAgentTool(logger: Logger): RegisteredTool<DeployHe
       // Explicit logging instructions so agents persist progress/findings even without MCP tool access
       const progressFilePath = path.join(workspace, 'progress', `${agentId}_progress.jsonl`);
       const findingsFilePath = path.join(workspace, 'findings', `${agentId}_findings.jsonl`);
-      agentPrompt += `\n\nーーー\nPROGRESS & FINDINGS LOGGING (Required)\n\nWrite concise JSONL entries regularly so orchestration can track you.\n\n- Progress file: ${progressFilePath}\n- Findings file: ${findingsFilePath}\n\nProgress entry (example):\n{"timestamp":"$(date -Iseconds)","agent_id":"${agentId}","status":"working","message":"<what you are doing>","progress":10}\nShell command:\nexport _now=\"$(date -Iseconds)\"; echo '{"timestamp":"'"'"${_now}"'"'","agent_id":"${agentId}","status":"working","message":"<what you are doing>","progress":10}' >> "${progressFilePath}"\n\nFinding entry (example):\n{"timestamp":"$(date -Iseconds)","agent_id":"${agentId}","finding_type":"<type>","severity":"low|medium|high|critical","message":"<summary>","data":{}}\nShell command:\nexport _now=\"$(date -Iseconds)\"; echo '{"timestamp":"'"'"${_now}"'"'","agent_id":"${agentId}","finding_type":"<type>","severity":"low","message":"<summary>","data":{}}' >> "${findingsFilePath}"`;
+      agentPrompt += renderLoggingInstructions(agentId, progressFilePath, findingsFilePath);
 
-      const promptFile = path.join(workspace, `agent_prompt_${agentId}.txt`);
+      // Prompt files are read once by the spawned session; tmpfs when available
+      const promptDir = resolveEphemeralDir(input.task_id, workspace);
+      const promptFile = path.join(promptDir, `agent_prompt_${agentId}.txt`);
       const fs = await import('fs');
-      await fs.promises.mkdir(workspace, { recursive: true });
+      await ensureDirOnce(promptDir);
       await fs.promises.writeFile(promptFile, agentPrompt, 'utf-8');
 
       const callingProjectDir = registry.caller_cwd || process.cwd();
@@ -92,8 +135,13 @@ export function deployHeadlessAgentTool(logger: Logger): RegisteredTool<DeployHe
 
       const tmux = await createTmuxSession(sessionName, codexCommand, callingProjectDir);
       if (!tmux.success) {
+        rollbackReservation();
         return [{ type: 'text', text: JSON.stringify({ success: false, error: tmux.error || 'Failed to create tmux session' }) }];
       }
+      if (!(await waitForTmuxSession(sessionName))) {
+        rollbackReservation();
+        return [{ type: 'text', text: JSON.stringify({ success: false, error: `Session ${sessionName} exited immediately after creation` }) }];
+      }
 
       const agentEntry = {
         id: agentId,
@@ -101,15 +149,19 @@ export function deployHeadlessAgentTool(logger: Logger): RegisteredTool<DeployHe
         parent: input.parent,
         depth,
         status: 'running',
-        started_at: new Date().toISOString(),
+        started_at: nowIso,
         progress: 0,
         tmux_session: sessionName,
       };
       registry.agents = registry.agents || [];
       registry.agents.push(agentEntry);
-      registry.total_spawned = Number(registry.total_spawned || 0) + 1;
-      registry.active_count = Number(registry.active_count || 0) + 1;
-      await writeJsonFile(registryPath, registry);
+      // Counters were already bumped by the reservation above.
+      // Hot path persists only the tiny counter sidecar plus the spawn event;
+      // the full registry flush is coalesced so AGENT_REGISTRY.json (read
+      // directly by scripts/monitor.sh) still converges under deploy-only load
+      await saveTaskCounters(input.task_id);
+      await appendTaskEvent(workspace, { op: 'spawn', ...agentEntry });
+      scheduleRegistrySave(input.task_id);
 
       const payload = {
         success: true,
@@ -136,76 +188,8 @@ function createOrchestrationGuidancePrompt(agentType: string, taskDescription: s
   if (complexity >= 15) { intensity = 'STRONGLY ENCOURAGED'; childCount = '3-4 child agents'; }
   else if (complexity >= 10) { intensity = 'ENCOURAGED'; childCount = '2-3 child agents'; }
   const bullet = recommendations.slice(0, 6).map((a) => `• ${a}`).join('\n');
-  return `\n\n🎯 ORCHESTRATION GUIDANCE (Depth ${currentDepth}/${maxDepth}, Complexity: ${complexity}/20):\n\nYou are ${intensity} to spawn specialized child agents for better implementation quality.\n\nRECOMMENDED CHILD SPECIALISTS:\n${bullet}\n\n🚀 ORCHESTRATION STRATEGY:\n1. ANALYZE if your task benefits from specialization\n2. SPAWN ${childCount} with focused, specific roles\n3. COORDINATE their work efficiently\n4. Each child should handle a distinct domain\n\n💡 NAMING CONVENTION: Use clear, descriptive names:\n   - 'css_responsive_specialist' not just 'css'\n   - 'api_authentication_handler' not just 'auth'\n   - 'database_optimization_expert' not just 'db'\n\n⭐ SUCCESS CRITERIA: Balance specialization with efficiency:\n   - Spawn specialists only when beneficial\n   - Coordinate effectively without micro-management\n   - Deliver comprehensive, integrated results`;
+  return (
+    `\n\n🎯 ORCHESTRATION GUIDANCE (Depth ${currentDepth}/${maxDepth}, Complexity: ${complexity}/20):\n\nYou are ${intensity} to spawn specialized child agents for better implementation quality.\n\nRECOMMENDED CHILD SPECIALISTS:\n${bullet}` +
+    GUIDANCE_TAIL_TPL.replace('%CHILD_COUNT%', () => childCount)
+  );
 }
-
-function calculateTaskComplexity(description: string): number {
-  const complexityKeywords: Record<string, number> = {
-    comprehensive: 5,
-    complete: 4,
-    full: 4,
-    entire: 4,
-    system: 3,
-    platform: 3,
-    application: 3,
-    website: 2,
-    frontend: 2,
-    backend: 2,
-    database: 2,
-    api: 2,
-    testing: 2,
-    security: 2,
-    performance: 2,
-    optimization: 2,
-    deployment: 2,
-    'ci/cd': 2,
-    monitoring: 2,
-    analytics: 2,
-    authentication: 2,
-    authorization: 2,
-    integration: 2,
-  };
-  let score = 1;
-  const lower = description.toLowerCase();
-  for (const [k, v] of Object.entries(complexityKeywords)) {
-    if (lower.includes(k)) score += v;
-  }
-  if (description.length > 200) score += 2;
-  if (lower.includes('layers') || lower.includes('multi')) score += 3;
-  if (lower.includes('specialist') || lower.includes('expert')) score += 2;
-  return Math.min(score, 20);
-}
-
-function generateSpecializationRecommendations(taskDescription: string, currentDepth: number): string[] {
-  const lower = taskDescription.toLowerCase();
-  const domainPatterns: Record<string, string[]> = {
-    frontend: ['frontend', 'ui', 'ux', 'react', 'vue', 'angular', 'css', 'javascript', 'html'],
-    backend: ['backend', 'api', 'server', 'database', 'sql', 'node', 'python', 'java'],
-    design: ['design', 'ui/ux', 'visual', 'branding', 'typography', 'layout', 'user experience'],
-    data: ['data', 'analytics', 'metrics', 'tracking', 'database', 'sql', 'mongodb'],
-    security: ['security', 'auth', 'authentication', 'authorization', 'encryption', 'ssl'],
-    performance: ['performance', 'optimization', 'speed', 'caching', 'load', 'scalability'],
-    testing: ['testing', 'qa', 'test', 'validation', 'e2e', 'unit test', 'integration'],
-    devops: ['deployment', 'ci/cd', 'docker', 'kubernetes', 'infrastructure', 'monitoring'],
-    mobile: ['mobile', 'ios', 'android', 'react native', 'flutter', 'responsive'],
-    ai_ml: ['ai', 'ml', 'machine learning', 'recommendation', 'algorithm', 'intelligence'],
-  };
-  const recs = new Set<string>();
-  for (const [domain, keywords] of Object.entries(domainPatterns)) {
-    if (keywords.some((k) => lower.includes(k))) {
-      if (currentDepth === 1) recs.add(`${domain}_lead`);
-      else if (currentDepth === 2) {
-        if (domain === 'frontend') ['css_specialist', 'js_specialist', 'component_specialist', 'animation_specialist'].forEach((x) => recs.add(x));
-        else if (domain === 'backend') ['api_specialist', 'database_specialist', 'auth_specialist', 'integration_specialist'].forEach((x) => recs.add(x));
-        else if (domain === 'design') ['visual_designer', 'ux_researcher', 'interaction_designer', 'brand_specialist'].forEach((x) => recs.add(x));
-        else if (domain === 'data') ['data_engineer', 'analytics_specialist', 'visualization_expert', 'etl_specialist'].forEach((x) => recs.add(x));
-      } else if (currentDepth >= 3) {
-        ['optimizer', 'validator', 'implementer', 'tester'].forEach((suffix) => recs.add(`${domain}_${suffix}`));
-      }
-    }
-  }
-  if (currentDepth <= 2) ['architect', 'quality_assurance', 'documentation_specialist'].forEach((x) => recs.add(x));
-  return Array.from(recs);
-}
-
-
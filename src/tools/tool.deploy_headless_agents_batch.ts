@@ -0,0 +1,56 @@
+import { z } from 'zod';
+import { zodToJsonSchema } from 'zod-to-json-schema';
+import { RegisteredTool } from './index.js';
+import type { Logger } from '../utils/logger.js';
+import { deployHeadlessAgentSchema, deployHeadlessAgentTool } from './tool.deploy_headless_agent.js';
+
+export const deployHeadlessAgentsBatchSchema = z.object({
+  task_id: z.string().min(1),
+  agents: z
+    .array(
+      z.object({
+        agent_type: z.string().min(1),
+        prompt: z.string().min(1),
+        parent: z.string().default('orchestrator'),
+      }),
+    )
+    .min(1),
+});
+
+export type DeployHeadlessAgentsBatchInput = z.infer<typeof deployHeadlessAgentsBatchSchema>;
+
+export function deployHeadlessAgentsBatchTool(logger: Logger): RegisteredTool<DeployHeadlessAgentsBatchInput> {
+  const deploy = deployHeadlessAgentTool(logger);
+  return {
+    definition: {
+      name: 'deploy_headless_agents_batch',
+      description: 'Deploy several headless agents concurrently (delegates to deploy_headless_agent)',
+      inputSchema: zodToJsonSchema(deployHeadlessAgentsBatchSchema),
+    },
+    schema: deployHeadlessAgentsBatchSchema.strict(),
+    handler: async (input) => {
+      // Fire the tmux session creations concurrently instead of one tool
+      // round-trip per agent; each deploy still enforces its own limits
+      const results = await Promise.all(
+        input.agents.map(async (agent) => {
+          const valid = deployHeadlessAgentSchema.parse({ task_id: input.task_id, ...agent });
+          const res = await deploy.handler(valid);
+          try {
+            return JSON.parse(res[0]?.text ?? '{}');
+          } catch {
+            return { success: false, error: 'Invalid deploy response' };
+          }
+        }),
+      );
+      const deployed = results.filter((r) => r.success).length;
+      const payload = {
+        success: deployed > 0,
+        task_id: input.task_id,
+        deployed,
+        failed: results.length - deployed,
+        results,
+      };
+      return [{ type: 'text', text: JSON.stringify(payload) }];
+    },
+  };
+}
@@ -3,8 +3,7 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile } from '../utils/fs.js';
+import { getAgentById, getTaskRegistry } from '../utils/registry.js';
 import { checkTmuxSessionExists, getTmuxSessionOutput } from '../utils/tmux.js';
 
 export const getAgentOutputSchema = z.object({
@@ -23,12 +22,11 @@ export function getAgentOutputTool(_logger: Logger): RegisteredTool<GetAgentOutp
     },
     schema: getAgentOutputSchema.strict(),
     handler: async (input) => {
-      const { workspace, registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) {
+      const { registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) {
         return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
       }
-      const registry = await readJsonFile<any>(registryPath, {});
-      const agent = (registry.agents || []).find((a: any) => a.id === input.agent_id);
+      const agent = getAgentById(registry, input.agent_id);
       if (!agent) {
         return [{ type: 'text', text: JSON.stringify({ success: false, error: `Agent ${input.agent_id} not found` }) }];
       }
@@ -3,12 +3,14 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile, writeJsonFile } from '../utils/fs.js';
-import { checkTmuxSessionExists } from '../utils/tmux.js';
+import { appendTaskEvent, getTaskRegistry, saveTaskRegistry } from '../utils/registry.js';
+import { captureTmuxSessionsOutput, listTmuxSessions } from '../utils/tmux.js';
+import { newestEntries, readJsonlDir, readJsonlFile } from '../utils/jsonl.js';
 
 export const getRealTaskStatusSchema = z.object({
   task_id: z.string().min(1),
+  agent_id: z.string().min(1).optional(),
+  include_agent_output: z.boolean().default(false),
 });
 
 export type GetRealTaskStatusInput = z.infer<typeof getRealTaskStatusSchema>;
@@ -17,53 +19,52 @@ export function getRealTaskStatusTool(_logger: Logger): RegisteredTool<GetRealTa
   return {
     definition: {
       name: 'get_real_task_status',
-      description: 'Get detailed status of a real task and its agents',
+      description:
+        'Get detailed status of a real task and its agents; agent_id narrows recent updates/findings to one agent, include_agent_output adds live tmux pane output per running agent',
       inputSchema: zodToJsonSchema(getRealTaskStatusSchema),
     },
     schema: getRealTaskStatusSchema.strict(),
     handler: async (input) => {
-      const { workspace, registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
-      const registry = await readJsonFile<any>(registryPath, {});
+      const { workspace, registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
       let changed = false;
-      for (const agent of registry.agents || []) {
-        if (agent.status === 'running' && agent.tmux_session) {
-          const exists = await checkTmuxSessionExists(String(agent.tmux_session));
-          if (!exists) {
-            agent.status = 'completed';
-            registry.active_count = Math.max(0, Number(registry.active_count || 0) - 1);
-            registry.completed_count = Number(registry.completed_count || 0) + 1;
-            changed = true;
-          }
+      const runningAgents = (registry.agents || []).filter((a: any) => a.status === 'running' && a.tmux_session);
+      // One list-sessions call instead of one has-session per agent
+      const aliveSessions = runningAgents.length > 0 ? await listTmuxSessions() : new Set<string>();
+      for (const agent of runningAgents) {
+        if (!aliveSessions.has(String(agent.tmux_session))) {
+          agent.status = 'completed';
+          registry.active_count = Math.max(0, Number(registry.active_count || 0) - 1);
+          registry.completed_count = Number(registry.completed_count || 0) + 1;
+          changed = true;
+          void appendTaskEvent(workspace, { op: 'status', agent_id: agent.id, status: 'completed' });
         }
       }
-      if (changed) await writeJsonFile(registryPath, registry);
+      if (changed) await saveTaskRegistry(input.task_id);
 
-      const readJsonl = async (dir: string, suffix: string) => {
-        const fs = await import('fs');
-        const p = await import('path');
-        const out: any[] = [];
-        try {
-          for (const file of fs.readdirSync(dir)) {
-            if (file.endsWith(suffix)) {
-              try {
-                const lines = fs.readFileSync(p.join(dir, file), 'utf-8').split('\n');
-                for (const line of lines) {
-                  const l = line.trim();
-                  if (!l) continue;
-                  try { out.push(JSON.parse(l)); } catch {}
-                }
-              } catch {}
-            }
-          }
-        } catch {}
-        return out;
-      };
+      // Live pane output on demand; the batched capture pipelines all the
+      // capture-pane calls down one control connection (or one fork)
+      let agentOutput: Record<string, string> | null = null;
+      if (input.include_agent_output) {
+        const liveAgents = (registry.agents || []).filter(
+          (a: any) => a.status === 'running' && a.tmux_session && (!input.agent_id || String(a.id) === input.agent_id),
+        );
+        const captured = await captureTmuxSessionsOutput(liveAgents.map((a: any) => String(a.tmux_session)));
+        agentOutput = {};
+        for (const agent of liveAgents) {
+          const output = captured[String(agent.tmux_session)];
+          if (output !== undefined) agentOutput[String(agent.id)] = output;
+        }
+      }
 
-      const progressEntries = await readJsonl(path.join(workspace, 'progress'), '_progress.jsonl');
-      const findingsEntries = await readJsonl(path.join(workspace, 'findings'), '_findings.jsonl');
-      progressEntries.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
-      findingsEntries.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
+      // Log files are named by agent id, so an agent-filtered query reads
+      // exactly two files instead of scanning the whole directory
+      const progressEntries = input.agent_id
+        ? await readJsonlFile(path.join(workspace, 'progress', `${input.agent_id}_progress.jsonl`))
+        : await readJsonlDir(path.join(workspace, 'progress'), '_progress.jsonl');
+      const findingsEntries = input.agent_id
+        ? await readJsonlFile(path.join(workspace, 'findings', `${input.agent_id}_findings.jsonl`))
+        : await readJsonlDir(path.join(workspace, 'findings'), '_findings.jsonl');
 
       const payload = {
         success: true,
@@ -79,11 +80,21 @@ export function getRealTaskStatusTool(_logger: Logger): RegisteredTool<GetRealTa
         },
         hierarchy: registry.agent_hierarchy || {},
         enhanced_progress: {
-          recent_updates: progressEntries.slice(0, 10),
-          recent_findings: findingsEntries.slice(0, 5),
-          total_progress_entries: progressEntries.length,
-          total_findings: findingsEntries.length,
+          recent_updates: newestEntries(progressEntries, 10),
+          recent_findings: newestEntries(findingsEntries, 5),
+          // Cumulative counters survive log rotation but miss entries agents
+          // append straight from the shell, so reconcile with the scanned
+          // count; the larger of the two never understates. The counters are
+          // task-wide though, so an agent-scoped query reports its own scan
+          // alone rather than the whole task's totals.
+          total_progress_entries: input.agent_id
+            ? progressEntries.length
+            : Math.max(Number(registry.progress_count ?? 0), progressEntries.length),
+          total_findings: input.agent_id
+            ? findingsEntries.length
+            : Math.max(Number(registry.findings_count ?? 0), findingsEntries.length),
         },
+        ...(agentOutput !== null ? { agent_output: agentOutput } : {}),
         spiral_status: registry.spiral_checks || {},
         limits: {
           max_agents: registry.max_agents || 10,
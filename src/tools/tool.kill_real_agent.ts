@@ -3,8 +3,7 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile, writeJsonFile } from '../utils/fs.js';
+import { appendTaskEvent, getAgentById, getTaskRegistry, saveTaskRegistry } from '../utils/registry.js';
 import { checkTmuxSessionExists, killTmuxSession } from '../utils/tmux.js';
 
 export const killRealAgentSchema = z.object({
@@ -24,12 +23,11 @@ export function killRealAgentTool(_logger: Logger): RegisteredTool<KillRealAgent
     },
     schema: killRealAgentSchema.strict(),
     handler: async (input) => {
-      const { registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) {
+      const { workspace, registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) {
         return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
       }
-      const registry = await readJsonFile<any>(registryPath, {});
-      const agent = (registry.agents || []).find((a: any) => a.id === input.agent_id);
+      const agent = getAgentById(registry, input.agent_id);
       if (!agent) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Agent ${input.agent_id} not found` }) }];
 
       const sessionName = agent.tmux_session as string | undefined;
@@ -42,7 +40,8 @@ export function killRealAgentTool(_logger: Logger): RegisteredTool<KillRealAgent
       agent.terminated_at = new Date().toISOString();
       agent.termination_reason = input.reason;
       registry.active_count = Math.max(0, Number(registry.active_count || 0) - 1);
-      await writeJsonFile(registryPath, registry);
+      await saveTaskRegistry(input.task_id);
+      void appendTaskEvent(workspace, { op: 'status', agent_id: input.agent_id, status: 'terminated', reason: input.reason });
 
       return [
         {
@@ -3,8 +3,9 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile } from '../utils/fs.js';
+import { getTaskRegistry, scheduleRegistrySave } from '../utils/registry.js';
+import { appendJsonlLine } from '../utils/jsonl.js';
+import { ensureDirOnce } from '../utils/fs.js';
 import { getComprehensiveTaskStatus } from './util.comprehensive_status.js';
 
 export const reportAgentFindingSchema = z.object({
@@ -14,6 +15,7 @@ export const reportAgentFindingSchema = z.object({
   severity: z.enum(['low', 'medium', 'high', 'critical']),
   message: z.string().min(1),
   data: z.record(z.any()).optional(),
+  return_coordination: z.boolean().default(false),
 });
 
 export type ReportAgentFindingInput = z.infer<typeof reportAgentFindingSchema>;
@@ -22,16 +24,16 @@ export function reportAgentFindingTool(_logger: Logger): RegisteredTool<ReportAg
   return {
     definition: {
       name: 'report_agent_finding',
-      description: 'Report a finding/discovery from an agent and return coordination status',
+      description:
+        'Report a finding/discovery from an agent; pass return_coordination=true for the full task status (also available via task://{task_id}/status)',
       inputSchema: zodToJsonSchema(reportAgentFindingSchema),
     },
     schema: reportAgentFindingSchema.strict(),
     handler: async (input) => {
-      const { workspace, registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
+      const { workspace, registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
       const findingsFile = path.join(workspace, 'findings', `${input.agent_id}_findings.jsonl`);
-      const fs = await import('fs');
-      await fs.promises.mkdir(path.dirname(findingsFile), { recursive: true });
+      await ensureDirOnce(path.dirname(findingsFile));
       const entry = {
         timestamp: new Date().toISOString(),
         agent_id: input.agent_id,
@@ -40,9 +42,11 @@ export function reportAgentFindingTool(_logger: Logger): RegisteredTool<ReportAg
         message: input.message,
         data: input.data ?? {},
       };
-      fs.appendFileSync(findingsFile, JSON.stringify(entry) + '\n');
+      appendJsonlLine(findingsFile, entry);
+      registry.findings_count = Number(registry.findings_count || 0) + 1;
+      scheduleRegistrySave(input.task_id);
 
-      const coordination = await getComprehensiveTaskStatus(input.task_id);
+      const coordination = input.return_coordination ? await getComprehensiveTaskStatus(input.task_id) : null;
       const payload = {
         success: true,
         own_finding: {
@@ -53,7 +57,7 @@ export function reportAgentFindingTool(_logger: Logger): RegisteredTool<ReportAg
           timestamp: entry.timestamp,
           data: input.data ?? {},
         },
-        coordination_info: coordination.success ? coordination : null,
+        coordination_info: coordination?.success ? coordination : null,
       };
       return [{ type: 'text', text: JSON.stringify(payload) }];
     },
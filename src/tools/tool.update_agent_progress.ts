@@ -3,8 +3,9 @@ import { zodToJsonSchema } from 'zod-to-json-schema';
 import path from 'path';
 import { RegisteredTool } from './index.js';
 import type { Logger } from '../utils/logger.js';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile, writeJsonFile } from '../utils/fs.js';
+import { appendTaskEvent, getAgentById, getTaskRegistry, scheduleRegistrySave } from '../utils/registry.js';
+import { queueJsonlAppend } from '../utils/jsonl.js';
+import { ensureDirOnce } from '../utils/fs.js';
 import { getComprehensiveTaskStatus } from './util.comprehensive_status.js';
 
 export const updateAgentProgressSchema = z.object({
@@ -13,6 +14,7 @@ export const updateAgentProgressSchema = z.object({
   status: z.string().min(1),
   message: z.string().min(1),
   progress: z.number().int().min(0).max(100).default(0),
+  return_coordination: z.boolean().default(false),
 });
 
 export type UpdateAgentProgressInput = z.infer<typeof updateAgentProgressSchema>;
@@ -21,17 +23,17 @@ export function updateAgentProgressTool(_logger: Logger): RegisteredTool<UpdateA
   return {
     definition: {
       name: 'update_agent_progress',
-      description: 'Update agent progress and return comprehensive task status',
+      description:
+        'Update agent progress; pass return_coordination=true for the full task status (also available via task://{task_id}/status)',
       inputSchema: zodToJsonSchema(updateAgentProgressSchema),
     },
     schema: updateAgentProgressSchema.strict(),
     handler: async (input) => {
-      const { workspace, registryPath } = await resolveTaskWorkspace(input.task_id);
-      if (!(await fileExists(registryPath))) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
+      const { workspace, registry, found } = await getTaskRegistry(input.task_id);
+      if (!found) return [{ type: 'text', text: JSON.stringify({ success: false, error: `Task ${input.task_id} not found` }) }];
       const progressDir = path.join(workspace, 'progress');
       const progressFile = path.join(progressDir, `${input.agent_id}_progress.jsonl`);
-      const fs = await import('fs');
-      await fs.promises.mkdir(progressDir, { recursive: true });
+      await ensureDirOnce(progressDir);
       const entry = {
         timestamp: new Date().toISOString(),
         agent_id: input.agent_id,
@@ -39,20 +41,30 @@ export function updateAgentProgressTool(_logger: Logger): RegisteredTool<UpdateA
         message: input.message,
         progress: input.progress,
       };
-      fs.appendFileSync(progressFile, JSON.stringify(entry) + '\n');
+      queueJsonlAppend(progressFile, entry);
 
-      const registry = await readJsonFile<any>(registryPath, {});
-      for (const agent of registry.agents || []) {
-        if (agent.id === input.agent_id) {
-          agent.last_update = new Date().toISOString();
-          agent.status = input.status;
-          agent.progress = input.progress;
-          break;
-        }
+      const agent = getAgentById(registry, input.agent_id);
+      if (agent) {
+        agent.last_update = entry.timestamp;
+        agent.status = input.status;
+        agent.progress = input.progress;
       }
-      await writeJsonFile(registryPath, registry);
+      // Running total survives log rotation and keeps status queries O(1)
+      registry.progress_count = Number(registry.progress_count || 0) + 1;
+      // Heartbeats mutate the cached registry and journal the change; the
+      // full registry flush is coalesced instead of rewritten per call
+      void appendTaskEvent(workspace, {
+        op: 'update',
+        agent_id: input.agent_id,
+        status: input.status,
+        progress: input.progress,
+        timestamp: entry.timestamp,
+      });
+      scheduleRegistrySave(input.task_id);
 
-      const coordination = await getComprehensiveTaskStatus(input.task_id);
+      // The comprehensive scan is the most expensive read in the server;
+      // a plain heartbeat ack skips it unless the caller opted in
+      const coordination = input.return_coordination ? await getComprehensiveTaskStatus(input.task_id) : null;
       const payload = {
         success: true,
         own_update: {
@@ -62,7 +74,7 @@ export function updateAgentProgressTool(_logger: Logger): RegisteredTool<UpdateA
           message: input.message,
           timestamp: entry.timestamp,
         },
-        coordination_info: coordination.success ? coordination : null,
+        coordination_info: coordination?.success ? coordination : null,
       };
       return [{ type: 'text', text: JSON.stringify(payload) }];
     },
@@ -1,45 +1,14 @@
 import path from 'path';
-import { resolveTaskWorkspace } from '../utils/workspace.js';
-import { fileExists, readJsonFile } from '../utils/fs.js';
+import { getTaskRegistry } from '../utils/registry.js';
+import { newestEntries, readJsonlDir } from '../utils/jsonl.js';
 
 export async function getComprehensiveTaskStatus(taskId: string): Promise<any> {
-  const { workspace, registryPath } = await resolveTaskWorkspace(taskId);
-  if (!(await fileExists(registryPath))) return { success: false, error: `Task ${taskId} not found` };
-  const registry = await readJsonFile<any>(registryPath, {});
+  const { workspace, registry, found } = await getTaskRegistry(taskId);
+  if (!found) return { success: false, error: `Task ${taskId} not found` };
 
-  const fs = await import('fs');
-  const allProgress: any[] = [];
-  const progressDir = path.join(workspace, 'progress');
-  try {
-    for (const file of fs.readdirSync(progressDir)) {
-      if (file.endsWith('_progress.jsonl')) {
-        const lines = fs.readFileSync(path.join(progressDir, file), 'utf-8').split('\n');
-        for (const line of lines) {
-          const l = line.trim();
-          if (!l) continue;
-          try { allProgress.push(JSON.parse(l)); } catch {}
-        }
-      }
-    }
-  } catch {}
-
-  const allFindings: any[] = [];
-  const findingsDir = path.join(workspace, 'findings');
-  try {
-    for (const file of fs.readdirSync(findingsDir)) {
-      if (file.endsWith('_findings.jsonl')) {
-        const lines = fs.readFileSync(path.join(findingsDir, file), 'utf-8').split('\n');
-        for (const line of lines) {
-          const l = line.trim();
-          if (!l) continue;
-          try { allFindings.push(JSON.parse(l)); } catch {}
-        }
-      }
-    }
-  } catch {}
-
-  allProgress.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
-  allFindings.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
+  // Incremental tail reads - only bytes appended since the last poll get parsed
+  const allProgress = await readJsonlDir(path.join(workspace, 'progress'), '_progress.jsonl');
+  const allFindings = await readJsonlDir(path.join(workspace, 'findings'), '_findings.jsonl');
 
   return {
     success: true,
@@ -56,8 +25,8 @@ export async function getComprehensiveTaskStatus(taskId: string): Promise<any> {
       agents_list: registry.agents || [],
     },
     coordination_data: {
-      recent_progress: allProgress.slice(0, 20),
-      recent_findings: allFindings.slice(0, 10),
+      recent_progress: newestEntries(allProgress, 20),
+      recent_findings: newestEntries(allFindings, 10),
       agent_status_summary: Object.fromEntries(
         (registry.agents || []).map((agent: any) => [
           agent.id,
@@ -10,6 +10,7 @@ export interface OrchestratorEnv {
   codex_FLAGS?: string;
   codex_CALLER_CWD?: string;
   codex_ORCHESTRATOR_AGENT_KEEPALIVE_SECS?: string;
+  codex_EPHEMERAL_DIR?: string;
 }
 
 export function getEnv(): OrchestratorEnv {
@@ -0,0 +1,141 @@
+// Task-complexity scoring and specialization recommendations, shared by
+// create_real_task and deploy_headless_agent. The keyword tables are compiled
+// once at module load into alternation regexes (longest alternative first so
+// e.g. 'authentication' wins over a shorter overlapping key), turning the
+// previous per-call loop of ~50 substring scans into a single linear pass.
+
+const COMPLEXITY_KEYWORDS: Record<string, number> = {
+  comprehensive: 5,
+  complete: 4,
+  full: 4,
+  entire: 4,
+  system: 3,
+  platform: 3,
+  application: 3,
+  website: 2,
+  frontend: 2,
+  backend: 2,
+  database: 2,
+  api: 2,
+  testing: 2,
+  security: 2,
+  performance: 2,
+  optimization: 2,
+  deployment: 2,
+  'ci/cd': 2,
+  monitoring: 2,
+  analytics: 2,
+  authentication: 2,
+  authorization: 2,
+  integration: 2,
+};
+
+const DOMAIN_PATTERNS: Record<string, string[]> = {
+  frontend: ['frontend', 'ui', 'ux', 'react', 'vue', 'angular', 'css', 'javascript', 'html'],
+  backend: ['backend', 'api', 'server', 'database', 'sql', 'node', 'python', 'java'],
+  design: ['design', 'ui/ux', 'visual', 'branding', 'typography', 'layout', 'user experience'],
+  data: ['data', 'analytics', 'metrics', 'tracking', 'database', 'sql', 'mongodb'],
+  security: ['security', 'auth', 'authentication', 'authorization', 'encryption', 'ssl'],
+  performance: ['performance', 'optimization', 'speed', 'caching', 'load', 'scalability'],
+  testing: ['testing', 'qa', 'test', 'validation', 'e2e', 'unit test', 'integration'],
+  devops: ['deployment', 'ci/cd', 'docker', 'kubernetes', 'infrastructure', 'monitoring'],
+  mobile: ['mobile', 'ios', 'android', 'react native', 'flutter', 'responsive'],
+  ai_ml: ['ai', 'ml', 'machine learning', 'recommendation', 'algorithm', 'intelligence'],
+};
+
+function escapeRegExp(value: string): string {
+  return value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+interface KeywordScanner {
+  pattern: RegExp;
+  // keyword -> shorter table keywords contained in it, e.g. 'ui/ux' -> ['ui', 'ux'].
+  // A hit on the longer keyword implies the text contains the shorter ones too,
+  // which keeps this equivalent to the old independent substring checks.
+  nested: Map<string, string[]>;
+}
+
+function compileKeywordScanner(keywords: Iterable<string>): KeywordScanner {
+  const keys = Array.from(new Set(keywords)).sort((a, b) => b.length - a.length);
+  // Zero-width lookahead so overlapping occurrences at different offsets all register
+  const pattern = new RegExp(`(?=(${keys.map(escapeRegExp).join('|')}))`, 'g');
+  const nested = new Map<string, string[]>();
+  for (const longer of keys) {
+    const contained = keys.filter((shorter) => shorter !== longer && longer.includes(shorter));
+    if (contained.length > 0) nested.set(longer, contained);
+  }
+  return { pattern, nested };
+}
+
+const COMPLEXITY_SCANNER = compileKeywordScanner(Object.keys(COMPLEXITY_KEYWORDS));
+const DOMAIN_SCANNER = compileKeywordScanner(Object.values(DOMAIN_PATTERNS).flat());
+
+function matchedKeywords(lower: string, scanner: KeywordScanner): Set<string> {
+  const seen = new Set<string>();
+  for (const match of lower.matchAll(scanner.pattern)) {
+    const keyword = match[1];
+    if (seen.has(keyword)) continue;
+    seen.add(keyword);
+    for (const contained of scanner.nested.get(keyword) ?? []) seen.add(contained);
+  }
+  return seen;
+}
+
+// Both functions are pure in their arguments and the task description never
+// changes for a given task, so repeated agent spawns memoize per input. The
+// caches are cleared wholesale when they grow past a bound; orchestrations
+// touch far fewer than 256 distinct descriptions.
+const MEMO_LIMIT = 256;
+const complexityMemo = new Map<string, number>();
+const recommendationMemo = new Map<string, string[]>();
+
+export function calculateTaskComplexity(description: string): number {
+  const cached = complexityMemo.get(description);
+  if (cached !== undefined) return cached;
+  const score = scoreTaskComplexity(description);
+  if (complexityMemo.size >= MEMO_LIMIT) complexityMemo.clear();
+  complexityMemo.set(description, score);
+  return score;
+}
+
+function scoreTaskComplexity(description: string): number {
+  let score = 1;
+  const lower = description.toLowerCase();
+  for (const keyword of matchedKeywords(lower, COMPLEXITY_SCANNER)) {
+    score += COMPLEXITY_KEYWORDS[keyword];
+  }
+  if (description.length > 200) score += 2;
+  if (lower.includes('layers') || lower.includes('multi')) score += 3;
+  if (lower.includes('specialist') || lower.includes('expert')) score += 2;
+  return Math.min(score, 20);
+}
+
+export function generateSpecializationRecommendations(taskDescription: string, currentDepth: number): string[] {
+  const key = `${currentDepth}\n${taskDescription}`;
+  const cached = recommendationMemo.get(key);
+  if (cached !== undefined) return cached;
+  const recommendations = buildRecommendations(taskDescription, currentDepth);
+  if (recommendationMemo.size >= MEMO_LIMIT) recommendationMemo.clear();
+  recommendationMemo.set(key, recommendations);
+  return recommendations;
+}
+
+function buildRecommendations(taskDescription: string, currentDepth: number): string[] {
+  const matched = matchedKeywords(taskDescription.toLowerCase(), DOMAIN_SCANNER);
+  const recs = new Set<string>();
+  for (const [domain, keywords] of Object.entries(DOMAIN_PATTERNS)) {
+    if (keywords.some((k) => matched.has(k))) {
+      if (currentDepth === 1) recs.add(`${domain}_lead`);
+      else if (currentDepth === 2) {
+        if (domain === 'frontend') ['css_specialist', 'js_specialist', 'component_specialist', 'animation_specialist'].forEach((x) => recs.add(x));
+        else if (domain === 'backend') ['api_specialist', 'database_specialist', 'auth_specialist', 'integration_specialist'].forEach((x) => recs.add(x));
+        else if (domain === 'design') ['visual_designer', 'ux_researcher', 'interaction_designer', 'brand_specialist'].forEach((x) => recs.add(x));
+        else if (domain === 'data') ['data_engineer', 'analytics_specialist', 'visualization_expert', 'etl_specialist'].forEach((x) => recs.add(x));
+      } else if (currentDepth >= 3) {
+        ['optimizer', 'validator', 'implementer', 'tester'].forEach((suffix) => recs.add(`${domain}_${suffix}`));
+      }
+    }
+  }
+  if (currentDepth <= 2) ['architect', 'quality_assurance', 'documentation_specialist'].forEach((x) => recs.add(x));
+  return Array.from(recs);
+}
@@ -5,6 +5,18 @@ export async function ensureDir(directoryPath: string): Promise<void> {
   await fs.mkdir(directoryPath, { recursive: true });
 }
 
+// Directories this process has already created. Hot paths (heartbeats,
+// findings) call this instead of ensureDir so steady state is a Set lookup,
+// not a mkdir syscall per write; the dirs themselves are made at task
+// registration and only re-created here if something removed them.
+const ensuredDirs = new Set<string>();
+
+export async function ensureDirOnce(directoryPath: string): Promise<void> {
+  if (ensuredDirs.has(directoryPath)) return;
+  await fs.mkdir(directoryPath, { recursive: true });
+  ensuredDirs.add(directoryPath);
+}
+
 export async function readJsonFile<T>(filePath: string, fallback: T): Promise<T> {
   try {
     const buffer = await fs.readFile(filePath, 'utf-8');
@@ -17,7 +29,43 @@ export async function readJsonFile<T>(filePath: string, fallback: T): Promise<T>
 export async function writeJsonFile(filePath: string, data: unknown): Promise<void> {
   const dir = path.dirname(filePath);
   await ensureDir(dir);
-  await fs.writeFile(filePath, JSON.stringify(data, null, 2), 'utf-8');
+  // Registry files are machine-consumed; compact output serializes faster
+  // and roughly halves the bytes written on the deploy/status hot paths
+  await fs.writeFile(filePath, JSON.stringify(data), 'utf-8');
+}
+
+// Serialize read-modify-write sequences on a shared JSON file across
+// processes. Node has no fcntl.flock, so an exclusive sidecar lock file
+// (open with 'wx') is the portable equivalent; locks older than 10s are
+// treated as stale leftovers from a crashed writer, and after ~5s of
+// contention we proceed unlocked rather than wedge the tool call.
+export async function withFileLock<T>(filePath: string, fn: () => Promise<T>): Promise<T> {
+  const lockPath = `${filePath}.lock`;
+  let handle: Awaited<ReturnType<typeof fs.open>> | null = null;
+  for (let attempt = 0; attempt < 100; attempt++) {
+    try {
+      handle = await fs.open(lockPath, 'wx');
+      break;
+    } catch (err: any) {
+      if (err?.code !== 'EEXIST') break;
+      try {
+        const st = await fs.stat(lockPath);
+        if (Date.now() - st.mtimeMs > 10_000) {
+          await fs.unlink(lockPath);
+          continue;
+        }
+      } catch {}
+      await new Promise((resolve) => setTimeout(resolve, 50));
+    }
+  }
+  try {
+    return await fn();
+  } finally {
+    if (handle) {
+      await handle.close();
+      await fs.unlink(lockPath).catch(() => {});
+    }
+  }
 }
 
 export async function fileExists(filePath: string): Promise<boolean> {
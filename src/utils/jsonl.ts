@@ -0,0 +1,354 @@
+import fs from 'fs';
+import { promises as fsp } from 'fs';
+import path from 'path';
+
+// Incremental reader for the per-agent *_progress.jsonl / *_findings.jsonl
+// logs. These files are append-only and get re-read on every status poll, so
+// parsing from byte 0 each time costs O(file size) per poll. Instead we cache
+// parsed entries per file together with the byte offset consumed so far and
+// only read + parse whatever was appended since the previous call. A shrunken
+// file (rotation/truncation) resets its cache entry.
+
+interface FileTail {
+  offset: number;
+  entries: any[];
+  // Timestamp of each entry, extracted once at ingest. Sort/merge consumers
+  // work over this dense string array instead of reaching into every object
+  // per comparison (structure-of-arrays layout)
+  keys: string[];
+  // Trailing bytes after the last newline (a partially written line); kept as
+  // a Buffer so multi-byte characters split across reads survive intact
+  remainder: Buffer;
+}
+
+export interface JsonlTail {
+  entries: any[];
+  keys: string[];
+}
+
+const tailCache = new Map<string, FileTail>();
+
+// Once a log passes this size it is rewritten with only its most recent
+// entries. Coordination only ever looks at the latest status per agent, so
+// dropping old history is safe, and the offset cache means the rewrite is
+// built from entries already in memory.
+const ROTATE_BYTES = 1_000_000;
+const ROTATE_KEEP = 100;
+
+// How far back a cold read reaches into a large existing file; generous
+// enough to cover far more than the 10-20 entries any consumer shows
+const INITIAL_TAIL_BYTES = 256 * 1024;
+
+async function compactJsonlFile(filePath: string, cached: FileTail): Promise<void> {
+  // A non-empty remainder means the writer is mid-line; try again next poll
+  if (cached.remainder.length > 0) return;
+  try {
+    const kept = cached.entries.slice(-ROTATE_KEEP);
+    const data = kept.length > 0 ? kept.map((e) => JSON.stringify(e)).join('\n') + '\n' : '';
+    const tmp = `${filePath}.tmp`;
+    await fsp.writeFile(tmp, data);
+    // Shell agents append with echo >> concurrently; the remainder guard only
+    // covers a half-written line, not whole entries that landed after our last
+    // read. If the file grew past the cached offset, skip this poll's rotation
+    // rather than rename those entries away - the next read picks them up.
+    if ((await fsp.stat(filePath)).size > cached.offset) {
+      void fsp.unlink(tmp).catch(() => {});
+      return;
+    }
+    await fsp.rename(tmp, filePath);
+    closeAppendFd(filePath);
+    cached.entries = kept;
+    cached.keys = cached.keys.slice(-ROTATE_KEEP);
+    cached.offset = Buffer.byteLength(data);
+  } catch {}
+}
+
+// Concurrent reads of the same file (two directory scans in flight) would
+// race the shared tail cache; dedupe them onto one promise per path
+const inflight = new Map<string, Promise<JsonlTail>>();
+
+export async function readJsonlFile(filePath: string): Promise<any[]> {
+  return (await readJsonlTail(filePath)).entries;
+}
+
+export function readJsonlTail(filePath: string): Promise<JsonlTail> {
+  const pending = inflight.get(filePath);
+  if (pending) return pending;
+  const promise = readJsonlFileInner(filePath).finally(() => inflight.delete(filePath));
+  inflight.set(filePath, promise);
+  return promise;
+}
+
+async function readJsonlFileInner(filePath: string): Promise<JsonlTail> {
+  let cached = tailCache.get(filePath);
+  // Under an active directory watch an unmarked file cannot have changed;
+  // serve the cache without touching the filesystem at all
+  if (cached && watchedDirs.has(path.dirname(filePath)) && !dirtyFiles.has(filePath)) {
+    return { entries: cached.entries.slice(), keys: cached.keys.slice() };
+  }
+  dirtyFiles.delete(filePath);
+  let size: number;
+  try {
+    size = (await fsp.stat(filePath)).size;
+  } catch (err: any) {
+    // A vanished file is the one expected failure (agent not started yet, or
+    // rotation race); anything else should surface, not be eaten silently
+    if (err?.code !== 'ENOENT' && err?.code !== 'ENOTDIR') throw err;
+    return cached ? { entries: cached.entries.slice(), keys: cached.keys.slice() } : { entries: [], keys: [] };
+  }
+  if (!cached || size < cached.offset) {
+    cached = { offset: 0, entries: [], keys: [], remainder: Buffer.alloc(0) };
+    // Cold start on an already-large file (server restarted mid-task): only
+    // the recent tail feeds status output, so begin at the last chunk rather
+    // than parsing megabytes of history. The cut usually lands mid-line; that
+    // fragment fails JSON.parse and is dropped like any other corrupt line.
+    if (size > INITIAL_TAIL_BYTES) cached.offset = size - INITIAL_TAIL_BYTES;
+    tailCache.set(filePath, cached);
+  }
+  if (size > cached.offset) {
+    try {
+      const handle = await fsp.open(filePath, 'r');
+      try {
+        const buf = Buffer.alloc(size - cached.offset);
+        const { bytesRead } = await handle.read(buf, 0, buf.length, cached.offset);
+        cached.offset += bytesRead;
+        const chunk = cached.remainder.length > 0 ? Buffer.concat([cached.remainder, buf.subarray(0, bytesRead)]) : buf.subarray(0, bytesRead);
+        const lastNewline = chunk.lastIndexOf(0x0a);
+        cached.remainder = lastNewline >= 0 ? Buffer.from(chunk.subarray(lastNewline + 1)) : Buffer.from(chunk);
+        if (lastNewline >= 0) {
+          // JSON.parse tolerates surrounding whitespace, so lines go to the
+          // parser untrimmed - one less string allocation per line
+          for (const line of chunk.toString('utf-8', 0, lastNewline).split('\n')) {
+            if (line.length === 0) continue;
+            try {
+              const entry = JSON.parse(line);
+              cached.entries.push(entry);
+              cached.keys.push(String(entry?.timestamp ?? ''));
+            } catch (err) {
+              // Half-written or corrupt lines are skipped; only parse errors
+              // are expected here
+              if (!(err instanceof SyntaxError)) throw err;
+            }
+          }
+        }
+      } finally {
+        await handle.close();
+      }
+    } catch (err: any) {
+      if (err?.code !== 'ENOENT') throw err;
+    }
+  }
+  if (cached.offset > ROTATE_BYTES) await compactJsonlFile(filePath, cached);
+  return { entries: cached.entries.slice(), keys: cached.keys.slice() };
+}
+
+// Cached O_APPEND descriptors for the log files this process writes every
+// heartbeat. Reopening per append costs open+close syscalls each time; an
+// O_APPEND fd kept across calls turns a heartbeat into a single write, and
+// the kernel serializes the appends. Rotation in this module invalidates the
+// fd for the rewritten path so later appends reach the new inode.
+const appendFds = new Map<string, number>();
+
+export function appendJsonlLine(filePath: string, entry: any): void {
+  writeJsonlRaw(filePath, JSON.stringify(entry) + '\n');
+}
+
+function writeJsonlRaw(filePath: string, data: string): void {
+  let fd = appendFds.get(filePath);
+  try {
+    if (fd === undefined) {
+      fd = fs.openSync(filePath, 'a');
+      appendFds.set(filePath, fd);
+    }
+    fs.writeSync(fd, data);
+  } catch {
+    // Stale or unopenable fd (file removed underneath us); drop the cache
+    // entry and fall back to a one-shot append
+    closeAppendFd(filePath);
+    try {
+      fs.appendFileSync(filePath, data);
+    } catch {}
+  }
+}
+
+// Heartbeat-frequency appends are additionally funneled through a short
+// coalescing window: entries queue per file and one timer tick writes each
+// file's backlog as a single append. Under swarm load this turns a burst of
+// per-agent writes into one syscall per file per window. Nothing is dropped;
+// every queued entry is written in arrival order.
+const APPEND_WINDOW_MS = 50;
+const pendingAppends = new Map<string, string[]>();
+let appendTimer: NodeJS.Timeout | null = null;
+
+export function queueJsonlAppend(filePath: string, entry: any): void {
+  const line = JSON.stringify(entry);
+  const lines = pendingAppends.get(filePath);
+  if (lines) lines.push(line);
+  else pendingAppends.set(filePath, [line]);
+  if (!appendTimer) {
+    appendTimer = setTimeout(flushQueuedAppends, APPEND_WINDOW_MS);
+    appendTimer.unref();
+  }
+}
+
+function flushQueuedAppends(): void {
+  if (appendTimer) {
+    clearTimeout(appendTimer);
+    appendTimer = null;
+  }
+  for (const [filePath, lines] of pendingAppends) {
+    writeJsonlRaw(filePath, lines.join('\n') + '\n');
+  }
+  pendingAppends.clear();
+}
+
+function closeAppendFd(filePath: string): void {
+  const fd = appendFds.get(filePath);
+  if (fd === undefined) return;
+  appendFds.delete(filePath);
+  try {
+    fs.closeSync(fd);
+  } catch {}
+}
+
+process.once('exit', () => {
+  flushQueuedAppends();
+  for (const fd of appendFds.values()) {
+    try {
+      fs.closeSync(fd);
+    } catch {}
+  }
+});
+
+// Filesystem-event invalidation: one fs.watch per log directory marks files
+// dirty as they change, so steady-state polls (dashboards hitting status
+// every second while no agent writes) skip even the per-file stat and serve
+// straight from the tail cache. Where watching fails (unsupported fs), the
+// stat/mtime checks below still run, so this is purely an avoided syscall.
+const watchedDirs = new Map<string, fs.FSWatcher>();
+const dirtyFiles = new Set<string>();
+const dirtyDirs = new Set<string>();
+
+function watchDir(dir: string): boolean {
+  if (watchedDirs.has(dir)) return true;
+  try {
+    const watcher = fs.watch(dir, (_eventType, filename) => {
+      dirtyDirs.add(dir);
+      if (filename) {
+        dirtyFiles.add(path.join(dir, String(filename)));
+      } else {
+        // Platform did not report which file changed; assume any of them did
+        for (const cachedPath of tailCache.keys()) {
+          if (cachedPath.startsWith(dir + path.sep)) dirtyFiles.add(cachedPath);
+        }
+      }
+    });
+    watcher.unref();
+    watcher.on('error', () => {
+      watchedDirs.delete(dir);
+      try {
+        watcher.close();
+      } catch {}
+    });
+    watchedDirs.set(dir, watcher);
+    return true;
+  } catch {
+    return false;
+  }
+}
+
+// Directory listings keyed by the directory's mtime. Appending to a file does
+// not touch its parent's mtime, so between agent spawns (file creation) the
+// listing is served from memory and each poll costs one stat on the dir.
+interface DirListing {
+  mtimeNs: bigint;
+  files: string[];
+}
+
+const dirCache = new Map<string, DirListing>();
+
+export function listJsonlFiles(dir: string, suffix: string): string[] {
+  const key = `${dir}\n${suffix}`;
+  const cached = dirCache.get(key);
+  if (cached && watchDir(dir) && !dirtyDirs.has(dir)) return cached.files;
+  let mtimeNs: bigint;
+  try {
+    mtimeNs = fs.statSync(dir, { bigint: true }).mtimeNs;
+  } catch (err: any) {
+    // Log dirs appear lazily as tasks/agents start writing
+    if (err?.code !== 'ENOENT' && err?.code !== 'ENOTDIR') throw err;
+    return [];
+  }
+  dirtyDirs.delete(dir);
+  if (cached && cached.mtimeNs === mtimeNs) return cached.files;
+  const files: string[] = [];
+  try {
+    // withFileTypes surfaces the dirent type from the one getdents pass,
+    // avoiding a per-file stat just to skip stray subdirectories. On NFS and
+    // overlayfs getdents reports DT_UNKNOWN, which makes every type predicate
+    // false; accept those entries rather than silently dropping all log files
+    // there (a non-file with a matching suffix just yields zero entries later).
+    for (const dirent of fs.readdirSync(dir, { withFileTypes: true })) {
+      if (!dirent.name.endsWith(suffix)) continue;
+      const unknownType = !dirent.isFile() && !dirent.isDirectory() && !dirent.isSymbolicLink();
+      if (dirent.isFile() || unknownType) files.push(path.join(dir, dirent.name));
+    }
+  } catch (err: any) {
+    if (err?.code !== 'ENOENT' && err?.code !== 'ENOTDIR') throw err;
+    return [];
+  }
+  dirCache.set(key, { mtimeNs, files });
+  return files;
+}
+
+// Bounded top-K selection for the recent_updates/recent_findings slices.
+// Sorting the whole history just to keep 10-20 entries is O(N log N); a
+// binary-insert into a K-sized window is O(N log K), and most entries fail
+// the cheap "older than the current cutoff" test outright.
+export function newestEntries(entries: any[], k: number): any[] {
+  if (entries.length <= k) return sortByTimestamp(entries, 'desc');
+  const top: any[] = [];
+  // Keys mirror `top`; extracting the timestamp once per entry keeps the
+  // comparisons to plain string <, not repeated property lookups
+  const keys: string[] = [];
+  for (const entry of entries) {
+    const ts = String(entry?.timestamp ?? '');
+    if (top.length === k && ts <= keys[k - 1]) continue;
+    let lo = 0;
+    let hi = top.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (keys[mid] < ts) hi = mid;
+      else lo = mid + 1;
+    }
+    top.splice(lo, 0, entry);
+    keys.splice(lo, 0, ts);
+    if (top.length > k) {
+      top.pop();
+      keys.pop();
+    }
+  }
+  return top;
+}
+
+// Decorate-sort-undecorate: the timestamp key is pulled out of each entry
+// once, and ISO-8601 strings order correctly under plain code-unit
+// comparison, so the comparator avoids per-compare property access and the
+// locale machinery of localeCompare.
+export function sortByTimestamp(entries: any[], order: 'asc' | 'desc' = 'asc'): any[] {
+  const keyed: Array<[string, any]> = entries.map((e) => [String(e?.timestamp ?? ''), e]);
+  if (order === 'asc') keyed.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+  else keyed.sort((a, b) => (a[0] > b[0] ? -1 : a[0] < b[0] ? 1 : 0));
+  return keyed.map((pair) => pair[1]);
+}
+
+export async function readJsonlDir(dir: string, suffix: string): Promise<any[]> {
+  // Per-file reads hit the libuv threadpool, so issuing them together lets
+  // the stat/read syscalls for independent agent logs overlap
+  const perFile = await Promise.all(listJsonlFiles(dir, suffix).map((filePath) => readJsonlFile(filePath)));
+  const out: any[] = [];
+  for (const entries of perFile) {
+    for (const entry of entries) out.push(entry);
+  }
+  return out;
+}
@@ -0,0 +1,209 @@
+import path from 'path';
+import { promises as fs, renameSync, truncateSync, writeFileSync } from 'fs';
+import { queueJsonlAppend } from './jsonl.js';
+import { resolveTaskWorkspace } from './workspace.js';
+
+// Process-level cache of parsed AGENT_REGISTRY.json files. Tool handlers used
+// to re-read and fully rewrite the registry on every call; here the parsed
+// object is held per task_id (validated against the file's mtime in case
+// something else rewrote it), mutated in place, and flushed atomically via a
+// temp file + rename. Agent spawn/status changes are additionally appended to
+// a per-workspace events.jsonl journal for crash recovery.
+
+export interface TaskRegistryHandle {
+  workspace: string;
+  registryPath: string;
+  registry: any;
+  found: boolean;
+}
+
+interface CacheEntry {
+  registry: any;
+  registryPath: string;
+  workspace: string;
+  mtimeNs: bigint;
+}
+
+const cache = new Map<string, CacheEntry>();
+
+export async function getTaskRegistry(taskId: string): Promise<TaskRegistryHandle> {
+  const cached = cache.get(taskId);
+  if (cached) {
+    try {
+      const st = await fs.stat(cached.registryPath, { bigint: true });
+      if (st.mtimeNs === cached.mtimeNs) {
+        return { workspace: cached.workspace, registryPath: cached.registryPath, registry: cached.registry, found: true };
+      }
+    } catch {
+      cache.delete(taskId);
+    }
+  }
+  const { workspace, registryPath } = await resolveTaskWorkspace(taskId);
+  try {
+    const st = await fs.stat(registryPath, { bigint: true });
+    let registry: any = {};
+    try {
+      registry = JSON.parse(await fs.readFile(registryPath, 'utf-8'));
+    } catch {
+      registry = {};
+    }
+    // The spawn hot path persists only counters.json + an events.jsonl
+    // record; fold both back in so a cold load sees agents the full
+    // registry flush had not caught up with yet
+    await overlayCounters(workspace, registry);
+    await replaySpawnEvents(workspace, registry);
+    cache.set(taskId, { registry, registryPath, workspace, mtimeNs: st.mtimeNs });
+    return { workspace, registryPath, registry, found: true };
+  } catch {
+    return { workspace, registryPath, registry: {}, found: false };
+  }
+}
+
+async function overlayCounters(workspace: string, registry: any): Promise<void> {
+  try {
+    const counters = JSON.parse(await fs.readFile(path.join(workspace, 'counters.json'), 'utf-8'));
+    if (counters && typeof counters === 'object') {
+      registry.total_spawned = Number(counters.total_spawned || 0);
+      registry.active_count = Number(counters.active_count || 0);
+      registry.completed_count = Number(counters.completed_count || 0);
+    }
+  } catch (err: any) {
+    // No sidecar yet, or a torn write mid-update; the registry's own
+    // counters stand in either case
+    if (err?.code !== 'ENOENT' && !(err instanceof SyntaxError)) throw err;
+  }
+}
+
+async function replaySpawnEvents(workspace: string, registry: any): Promise<void> {
+  try {
+    const raw = await fs.readFile(path.join(workspace, 'events.jsonl'), 'utf-8');
+    const agents: any[] = (registry.agents = registry.agents || []);
+    const byId = new Map(agents.map((a: any) => [String(a.id), a]));
+    for (const line of raw.split('\n')) {
+      if (line.length === 0) continue;
+      let event: any;
+      try {
+        event = JSON.parse(line);
+      } catch {
+        continue;
+      }
+      if (event?.op === 'spawn' && event.id && !byId.has(String(event.id))) {
+        const { op, ...agentEntry } = event;
+        agents.push(agentEntry);
+        byId.set(String(event.id), agentEntry);
+      } else if ((event?.op === 'status' || event?.op === 'update') && event.agent_id) {
+        // Heartbeats and status transitions may only have reached the journal
+        // before a crash; re-apply them onto the registry entries
+        const agent = byId.get(String(event.agent_id));
+        if (agent) {
+          if (event.status !== undefined) agent.status = event.status;
+          if (event.progress !== undefined) agent.progress = event.progress;
+          if (event.timestamp !== undefined) agent.last_update = event.timestamp;
+        }
+      }
+    }
+  } catch (err: any) {
+    // Journal may simply not exist yet
+    if (err?.code !== 'ENOENT') throw err;
+  }
+}
+
+// Heartbeats are far too frequent to justify a full registry rewrite each
+// time. Callers on those paths mutate the cached object, journal the change
+// to events.jsonl, and schedule a coalesced flush: one write per task at most
+// every few seconds, with a synchronous flush of anything outstanding at exit.
+const FLUSH_DELAY_MS = 5000;
+const pendingFlushes = new Map<string, NodeJS.Timeout>();
+
+export function scheduleRegistrySave(taskId: string): void {
+  if (pendingFlushes.has(taskId)) return;
+  const timer = setTimeout(() => {
+    pendingFlushes.delete(taskId);
+    void saveTaskRegistry(taskId).catch(() => {});
+  }, FLUSH_DELAY_MS);
+  timer.unref();
+  pendingFlushes.set(taskId, timer);
+}
+
+function flushPendingRegistriesSync(): void {
+  for (const [taskId, timer] of pendingFlushes) {
+    clearTimeout(timer);
+    const entry = cache.get(taskId);
+    if (!entry) continue;
+    try {
+      const tmp = `${entry.registryPath}.tmp`;
+      writeFileSync(tmp, JSON.stringify(entry.registry), 'utf-8');
+      renameSync(tmp, entry.registryPath);
+      truncateSync(path.join(entry.workspace, 'events.jsonl'), 0);
+    } catch {}
+  }
+  pendingFlushes.clear();
+}
+
+process.once('exit', flushPendingRegistriesSync);
+
+// Counter-only sidecar written on the spawn hot path. Bumping total_spawned
+// used to rewrite the whole registry (which grows with every agent entry);
+// counters.json stays ~100 bytes no matter how many agents exist, and the
+// new agent's record rides on the events.jsonl append. The full registry
+// still gets flushed by the next saveTaskRegistry (status poll, kill, ...).
+export async function saveTaskCounters(taskId: string): Promise<void> {
+  const entry = cache.get(taskId);
+  if (!entry) return;
+  const counters = {
+    total_spawned: Number(entry.registry.total_spawned || 0),
+    active_count: Number(entry.registry.active_count || 0),
+    completed_count: Number(entry.registry.completed_count || 0),
+  };
+  try {
+    await fs.writeFile(path.join(entry.workspace, 'counters.json'), JSON.stringify(counters), 'utf-8');
+  } catch {}
+}
+
+export async function saveTaskRegistry(taskId: string): Promise<void> {
+  const entry = cache.get(taskId);
+  if (!entry) return;
+  const pending = pendingFlushes.get(taskId);
+  if (pending) {
+    clearTimeout(pending);
+    pendingFlushes.delete(taskId);
+  }
+  const tmp = `${entry.registryPath}.tmp`;
+  await fs.writeFile(tmp, JSON.stringify(entry.registry), 'utf-8');
+  await fs.rename(tmp, entry.registryPath);
+  const st = await fs.stat(entry.registryPath, { bigint: true });
+  entry.mtimeNs = st.mtimeNs;
+  // Keep the counter sidecar in step; a cold load overlays it on the registry
+  await saveTaskCounters(taskId);
+  // The snapshot now supersedes the journal, so reset it rather than letting
+  // replaySpawnEvents re-read an ever-growing file on every cold load.
+  // Truncating in place (instead of rename) keeps the cached append fd in
+  // jsonl.ts valid; events still sitting in the coalescing queue land after
+  // the truncate and replay harmlessly against the snapshot.
+  try {
+    await fs.truncate(path.join(entry.workspace, 'events.jsonl'), 0);
+  } catch (err: any) {
+    if (err?.code !== 'ENOENT') throw err;
+  }
+}
+
+// Id -> agent-entry index for the agents array, kept alongside the cached
+// registry object. Agents are only ever appended, so a stale index is
+// detected by comparing sizes and rebuilt in one pass.
+const agentIndexes = new WeakMap<object, Map<string, any>>();
+
+export function getAgentById(registry: any, agentId: string): any | undefined {
+  const agents: any[] = registry?.agents || [];
+  let index = registry ? agentIndexes.get(registry) : undefined;
+  if (!index || index.size !== agents.length) {
+    index = new Map(agents.map((a: any) => [String(a.id), a]));
+    if (registry) agentIndexes.set(registry, index);
+  }
+  return index.get(agentId);
+}
+
+export async function appendTaskEvent(workspace: string, event: Record<string, unknown>): Promise<void> {
+  // journal is best-effort; the registry flush remains the source of truth,
+  // and the coalescing queue batches a burst of events into one append
+  queueJsonlAppend(path.join(workspace, 'events.jsonl'), event);
+}
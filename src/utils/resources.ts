@@ -1,7 +1,10 @@
 import type { ListResourcesResult, ReadResourceResult } from '@modelcontextprotocol/sdk/types.js';
 import { getEnv } from '../types/env.js';
 import path from 'path';
-import { fileExists, readJsonFile } from './fs.js';
+import { promises as fsp } from 'fs';
+import { readJsonFile } from './fs.js';
+import { listJsonlFiles, newestEntries, readJsonlDir, readJsonlTail } from './jsonl.js';
+import { getTaskRegistry } from './registry.js';
 import { resolveTaskWorkspace } from './workspace.js';
 
 export async function listResources(): Promise<ListResourcesResult> {
@@ -18,6 +21,10 @@ export async function listResources(): Promise<ListResourcesResult> {
   };
 }
 
+// Serialized tasks://list snapshot keyed by the global registry's mtime;
+// dashboard polling re-serves the same string until the file changes
+let tasksListCache: { mtimeNs: bigint; text: string } | null = null;
+
 export async function readResource(uri: string): Promise<ReadResourceResult> {
   if (uri === 'tasks://list') {
     const env = getEnv();
@@ -25,15 +32,29 @@ export async function readResource(uri: string): Promise<ReadResourceResult> {
       ? path.resolve(expandPath(env.codex_ORCHESTRATOR_WORKSPACE))
       : path.resolve('.agent-workspace');
     const globalPath = path.join(base, 'registry', 'GLOBAL_REGISTRY.json');
-    const payload = (await fileExists(globalPath))
-      ? await readJsonFile(globalPath, { tasks: [], message: 'No tasks found' })
-      : { tasks: [], message: 'No tasks found' };
+    let mtimeNs: bigint | null = null;
+    try {
+      mtimeNs = (await fsp.stat(globalPath, { bigint: true })).mtimeNs;
+    } catch (err: any) {
+      if (err?.code !== 'ENOENT') throw err;
+    }
+    let text: string;
+    if (mtimeNs !== null && tasksListCache && tasksListCache.mtimeNs === mtimeNs) {
+      text = tasksListCache.text;
+    } else {
+      const payload =
+        mtimeNs !== null
+          ? await readJsonFile(globalPath, { tasks: [], message: 'No tasks found' })
+          : { tasks: [], message: 'No tasks found' };
+      text = JSON.stringify(payload, null, 2);
+      tasksListCache = mtimeNs !== null ? { mtimeNs, text } : null;
+    }
     return {
       contents: [
         {
           uri,
           mimeType: 'application/json',
-          text: JSON.stringify(payload, null, 2),
+          text,
         },
       ],
     };
@@ -48,7 +69,7 @@ export async function readResource(uri: string): Promise<ReadResourceResult> {
         {
           uri,
           mimeType: 'application/json',
-          text: JSON.stringify(payload, null, 2),
+          text: JSON.stringify(payload),
         },
       ],
     };
@@ -57,13 +78,13 @@ export async function readResource(uri: string): Promise<ReadResourceResult> {
   // task://{task_id}/progress-timeline
   if (uri.startsWith('task://') && uri.endsWith('/progress-timeline')) {
     const taskId = uri.slice('task://'.length, -'/progress-timeline'.length);
-    const payload = await computeTaskTimeline(taskId);
     return {
       contents: [
         {
           uri,
           mimeType: 'application/json',
-          text: JSON.stringify(payload, null, 2),
+          // Serialized incrementally during the merge; see computeTaskTimeline
+          text: await computeTaskTimeline(taskId),
         },
       ],
     };
@@ -74,7 +95,7 @@ export async function readResource(uri: string): Promise<ReadResourceResult> {
       {
         uri,
         mimeType: 'application/json',
-        text: JSON.stringify({ success: false, error: `Unknown resource: ${uri}` }, null, 2),
+        text: JSON.stringify({ success: false, error: `Unknown resource: ${uri}` }),
       },
     ],
   };
@@ -91,35 +112,14 @@ function expandPath(inputPath: string): string {
 }
 
 async function computeTaskStatus(taskId: string): Promise<any> {
-  const { workspace, registryPath } = await resolveTaskWorkspace(taskId);
-  if (!(await fileExists(registryPath))) return { success: false, error: `Task ${taskId} not found` };
-  const registry = await readJsonFile<any>(registryPath, {});
+  // Read through the registry cache so the counters overlay and event replay
+  // apply here too; agents polling task://{task_id}/status otherwise see an
+  // on-disk snapshot that lags the coalesced flush
+  const { workspace, registry, found } = await getTaskRegistry(taskId);
+  if (!found) return { success: false, error: `Task ${taskId} not found` };
 
-  const fs = await import('fs');
-  const pathMod = await import('path');
-  const readJsonl = (dir: string, suffix: string) => {
-    const out: any[] = [];
-    try {
-      for (const file of fs.readdirSync(dir)) {
-        if (file.endsWith(suffix)) {
-          try {
-            const lines = fs.readFileSync(pathMod.join(dir, file), 'utf-8').split('\n');
-            for (const line of lines) {
-              const l = line.trim();
-              if (l) {
-                try { out.push(JSON.parse(l)); } catch {}
-              }
-            }
-          } catch {}
-        }
-      }
-    } catch {}
-    return out;
-  };
-  const progress = readJsonl(pathMod.join(workspace, 'progress'), '_progress.jsonl');
-  const findings = readJsonl(pathMod.join(workspace, 'findings'), '_findings.jsonl');
-  progress.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
-  findings.sort((a, b) => String(b.timestamp).localeCompare(String(a.timestamp)));
+  const progress = await readJsonlDir(path.join(workspace, 'progress'), '_progress.jsonl');
+  const findings = await readJsonlDir(path.join(workspace, 'findings'), '_findings.jsonl');
 
   return {
     success: true,
@@ -135,10 +135,12 @@ async function computeTaskStatus(taskId: string): Promise<any> {
     },
     hierarchy: registry.agent_hierarchy || {},
     enhanced_progress: {
-      recent_updates: progress.slice(0, 10),
-      recent_findings: findings.slice(0, 5),
-      total_progress_entries: progress.length,
-      total_findings: findings.length,
+      recent_updates: newestEntries(progress, 10),
+      recent_findings: newestEntries(findings, 5),
+      // Counters miss shell-appended entries; the scanned count misses rotated
+      // ones, so take whichever is larger
+      total_progress_entries: Math.max(Number(registry.progress_count ?? 0), progress.length),
+      total_findings: Math.max(Number(registry.findings_count ?? 0), findings.length),
     },
     spiral_status: registry.spiral_checks || {},
     limits: {
@@ -149,47 +151,80 @@ async function computeTaskStatus(taskId: string): Promise<any> {
   };
 }
 
-async function computeTaskTimeline(taskId: string): Promise<any> {
+// Splice the entry_type tag into an entry's serialized form instead of
+// cloning the object just to add one field
+function tagEntryJson(json: string, entryType: string): string {
+  if (json === '{}') return `{"entry_type":"${entryType}"}`;
+  if (json.startsWith('{')) return `${json.slice(0, -1)},"entry_type":"${entryType}"}`;
+  return json;
+}
+
+// Serializes the timeline while merging: each winning entry goes straight
+// into the output pieces and the summary accumulates alongside, so no tagged
+// copy of the full history is ever materialized just to stringify it.
+async function computeTaskTimeline(taskId: string): Promise<string> {
   const { workspace } = await resolveTaskWorkspace(taskId);
-  const fs = await import('fs');
-  const pathMod = await import('path');
-  const allProgress: any[] = [];
-  const allFindings: any[] = [];
-  try {
-    for (const file of fs.readdirSync(pathMod.join(workspace, 'progress'))) {
-      if (file.endsWith('_progress.jsonl')) {
-        const lines = fs.readFileSync(pathMod.join(workspace, 'progress', file), 'utf-8').split('\n');
-        for (const line of lines) { const l = line.trim(); if (!l) continue; try { allProgress.push(JSON.parse(l)); } catch {} }
+  // Keep per-file lists separate: each is already in timestamp order, so the
+  // timeline comes from a k-way merge rather than a global sort
+  const progressTails = await Promise.all(
+    listJsonlFiles(path.join(workspace, 'progress'), '_progress.jsonl').map((f) => readJsonlTail(f)),
+  );
+  const findingsTails = await Promise.all(
+    listJsonlFiles(path.join(workspace, 'findings'), '_findings.jsonl').map((f) => readJsonlTail(f)),
+  );
+  const streams = [
+    ...progressTails.map((tail) => ({ ...tail, entryType: 'progress', pos: 0 })),
+    ...findingsTails.map((tail) => ({ ...tail, entryType: 'finding', pos: 0 })),
+  ].filter((stream) => stream.entries.length > 0);
+  // A file violating append order falls back to a decorate-and-sort pass so
+  // output order matches the merge in all cases
+  let sorted = true;
+  for (const stream of streams) {
+    for (let i = 1; i < stream.keys.length; i++) {
+      if (stream.keys[i] < stream.keys[i - 1]) {
+        sorted = false;
+        break;
       }
     }
-  } catch {}
-  try {
-    for (const file of fs.readdirSync(pathMod.join(workspace, 'findings'))) {
-      if (file.endsWith('_findings.jsonl')) {
-        const lines = fs.readFileSync(pathMod.join(workspace, 'findings', file), 'utf-8').split('\n');
-        for (const line of lines) { const l = line.trim(); if (!l) continue; try { allFindings.push(JSON.parse(l)); } catch {} }
+    if (!sorted) break;
+  }
+  const pieces: string[] = [];
+  let start: string | null = null;
+  let end: string | null = null;
+  const agents = new Set<string>();
+  const consume = (entry: any, entryType: string) => {
+    pieces.push(tagEntryJson(JSON.stringify(entry), entryType));
+    const ts = entry?.timestamp ?? null;
+    if (start === null) start = ts;
+    end = ts;
+    if (entry?.agent_id) agents.add(String(entry.agent_id));
+  };
+  if (sorted) {
+    while (streams.length > 0) {
+      let minIdx = 0;
+      for (let i = 1; i < streams.length; i++) {
+        if (streams[i].keys[streams[i].pos] < streams[minIdx].keys[streams[minIdx].pos]) minIdx = i;
       }
+      const stream = streams[minIdx];
+      consume(stream.entries[stream.pos], stream.entryType);
+      stream.pos += 1;
+      if (stream.pos === stream.entries.length) streams.splice(minIdx, 1);
     }
-  } catch {}
-  allProgress.sort((a, b) => String(a.timestamp).localeCompare(String(b.timestamp)));
-  allFindings.sort((a, b) => String(a.timestamp).localeCompare(String(b.timestamp)));
-  const timeline = [
-    ...allProgress.map((p) => ({ ...p, entry_type: 'progress' })),
-    ...allFindings.map((f) => ({ ...f, entry_type: 'finding' })),
-  ].sort((a, b) => String(a.timestamp).localeCompare(String(b.timestamp)));
-  return {
-    task_id: taskId,
-    timeline,
-    summary: {
-      total_progress_entries: allProgress.length,
-      total_findings: allFindings.length,
-      timeline_span: {
-        start: timeline[0]?.timestamp ?? null,
-        end: timeline[timeline.length - 1]?.timestamp ?? null,
-      },
-      agents_active: new Set(timeline.map((e: any) => e.agent_id).filter(Boolean)).size,
-    },
+  } else {
+    const keyed: Array<[string, any, string]> = [];
+    for (const stream of streams) {
+      for (let i = 0; i < stream.entries.length; i++) keyed.push([stream.keys[i], stream.entries[i], stream.entryType]);
+    }
+    keyed.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+    for (const [, entry, entryType] of keyed) consume(entry, entryType);
+  }
+  const summary = {
+    total_progress_entries: progressTails.reduce((n, tail) => n + tail.entries.length, 0),
+    total_findings: findingsTails.reduce((n, tail) => n + tail.entries.length, 0),
+    timeline_span: { start, end },
+    agents_active: agents.size,
   };
+  return `{"task_id":${JSON.stringify(taskId)},"timeline":[${pieces.join(',')}],"summary":${JSON.stringify(summary)}}`;
 }
 
 
@@ -1,22 +1,145 @@
-import { spawn } from 'child_process';
+import { spawn, type ChildProcessByStdio } from 'child_process';
+import type { Readable, Writable } from 'stream';
+import fs from 'fs';
+import path from 'path';
+
+// Persistent tmux control-mode client. Instead of fork/exec-ing a tmux client
+// for every command (one `has-session` per agent per status poll), we keep a
+// single `tmux -C` subprocess and pipe commands over its stdin, parsing the
+// %begin/%end/%error framing tmux emits in control mode. If the control client
+// cannot be started (or dies mid-flight) each helper falls back to the old
+// one-shot spawn path.
+const CONTROL_SESSION = '_orchestrator_ctrl';
+
+interface ControlReply {
+  ok: boolean;
+  output: string;
+}
+
+class TmuxControl {
+  // Matches the ['pipe', 'pipe', 'ignore'] stdio layout below (stderr: null)
+  private child: ChildProcessByStdio<Writable, Readable, null> | null = null;
+  private pending: Array<(reply: ControlReply | null) => void> = [];
+  private buffer = '';
+  private replyLines: string[] | null = null;
+  private failed = false;
+  private queue: Promise<unknown> = Promise.resolve();
+
+  private start(): boolean {
+    if (this.child) return true;
+    if (this.failed) return false;
+    try {
+      this.child = spawn('tmux', ['-C', 'new-session', '-A', '-D', '-s', CONTROL_SESSION], {
+        stdio: ['pipe', 'pipe', 'ignore'],
+      });
+    } catch {
+      this.failed = true;
+      return false;
+    }
+    const child = this.child;
+    child.on('error', () => this.teardown());
+    child.on('exit', () => this.teardown());
+    child.stdout.setEncoding('utf-8');
+    child.stdout.on('data', (chunk: string) => this.onData(chunk));
+    child.unref();
+    // unref() alone is not enough: the piped stdin/stdout sockets also hold
+    // the event loop open, which would keep the server alive after its own
+    // transport closes for as long as the control client lives
+    child.stdin.unref();
+    child.stdout.unref();
+    // Control mode emits an unsolicited %begin/%end guard block on attach.
+    // Park a sentinel resolver in front of it so that block cannot be paired
+    // with the first real command and desync the FIFO for every later reply.
+    this.pending.push(() => {});
+    return true;
+  }
+
+  private teardown(): void {
+    this.child = null;
+    this.failed = true;
+    const waiting = this.pending;
+    this.pending = [];
+    this.replyLines = null;
+    this.buffer = '';
+    // Resolve in-flight commands with null so callers fall back to spawn
+    for (const resolve of waiting) resolve(null);
+  }
+
+  private onData(chunk: string): void {
+    this.buffer += chunk;
+    let idx: number;
+    while ((idx = this.buffer.indexOf('\n')) >= 0) {
+      const line = this.buffer.slice(0, idx).replace(/\r$/, '');
+      this.buffer = this.buffer.slice(idx + 1);
+      this.onLine(line);
+    }
+  }
+
+  private onLine(line: string): void {
+    if (line.startsWith('%begin ')) {
+      this.replyLines = [];
+      return;
+    }
+    if (line.startsWith('%end ') || line.startsWith('%error ')) {
+      const output = (this.replyLines ?? []).join('\n');
+      this.replyLines = null;
+      // tmux answers commands in order, so replies pair FIFO with senders;
+      // the unsolicited attach block lands on the sentinel queued in start()
+      const resolve = this.pending.shift();
+      if (resolve) resolve({ ok: line.startsWith('%end '), output });
+      return;
+    }
+    if (this.replyLines) {
+      this.replyLines.push(line);
+    }
+    // Anything else outside a %begin block is an async notification
+    // (%output, %exit, %session-changed, ...) and is ignored.
+  }
+
+  send(command: string): Promise<ControlReply | null> {
+    // Serialize writes so interleaved tool calls cannot corrupt FIFO pairing
+    const run = this.queue.then(
+      () =>
+        new Promise<ControlReply | null>((resolve) => {
+          if (!this.start() || !this.child?.stdin.writable) {
+            resolve(null);
+            return;
+          }
+          this.pending.push(resolve);
+          this.child.stdin.write(command + '\n');
+        }),
+    );
+    this.queue = run.catch(() => undefined);
+    return run;
+  }
+}
+
+const control = new TmuxControl();
+
+function tmuxQuote(value: string): string {
+  return `'${value.replace(/'/g, "'\\''")}'`;
+}
+
+let tmuxAvailable: boolean | null = null;
 
 export async function checkTmuxAvailable(): Promise<boolean> {
-  return new Promise((resolve) => {
-    const child = spawn('tmux', ['-V']);
-    let resolved = false;
-    child.on('exit', (code) => {
-      if (!resolved) {
-        resolved = true;
-        resolve(code === 0);
-      }
-    });
-    child.on('error', () => {
-      if (!resolved) {
-        resolved = true;
-        resolve(false);
-      }
-    });
-  });
+  // tmux availability cannot change within a process lifetime, so resolve once.
+  // A PATH scan (the `which` approach) is a handful of stats instead of a
+  // fork/exec of `tmux -V` on every first-use path.
+  if (tmuxAvailable === null) tmuxAvailable = findTmuxOnPath() !== null;
+  return tmuxAvailable;
+}
+
+function findTmuxOnPath(): string | null {
+  for (const dir of (process.env.PATH || '').split(path.delimiter)) {
+    if (!dir) continue;
+    const candidate = path.join(dir, 'tmux');
+    try {
+      fs.accessSync(candidate, fs.constants.X_OK);
+      if (fs.statSync(candidate).isFile()) return candidate;
+    } catch {}
+  }
+  return null;
 }
 
 export interface TmuxResult {
@@ -26,6 +149,19 @@ export interface TmuxResult {
 }
 
 export async function createTmuxSession(sessionName: string, command: string, workingDir?: string): Promise<TmuxResult> {
+  const parts = ['new-session', '-d', '-s', tmuxQuote(sessionName)];
+  if (workingDir) {
+    parts.push('-c', tmuxQuote(workingDir));
+  }
+  parts.push(tmuxQuote(command));
+  const reply = await control.send(parts.join(' '));
+  if (reply) {
+    return reply.ok ? { success: true, output: reply.output } : { success: false, error: reply.output };
+  }
+  return createTmuxSessionViaSpawn(sessionName, command, workingDir);
+}
+
+function createTmuxSessionViaSpawn(sessionName: string, command: string, workingDir?: string): Promise<TmuxResult> {
   return new Promise((resolve) => {
     const args = ['new-session', '-d', '-s', sessionName];
     if (workingDir) {
@@ -45,6 +181,8 @@ export async function createTmuxSession(sessionName: string, command: string, wo
 }
 
 export async function checkTmuxSessionExists(sessionName: string): Promise<boolean> {
+  const reply = await control.send(`has-session -t ${tmuxQuote(sessionName)}`);
+  if (reply) return reply.ok;
   return new Promise((resolve) => {
     const child = spawn('tmux', ['has-session', '-t', sessionName], { stdio: ['ignore', 'ignore', 'ignore'] });
     child.on('exit', (code) => resolve(code === 0));
@@ -52,7 +190,21 @@ export async function checkTmuxSessionExists(sessionName: string): Promise<boole
   });
 }
 
+// Confirm a freshly created session is up without a fixed warm-up sleep;
+// tmux session creation completes in milliseconds, so a short backoff poll
+// resolves almost immediately in the common case
+export async function waitForTmuxSession(sessionName: string, delaysMs: number[] = [10, 20, 50, 100]): Promise<boolean> {
+  if (await checkTmuxSessionExists(sessionName)) return true;
+  for (const delay of delaysMs) {
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    if (await checkTmuxSessionExists(sessionName)) return true;
+  }
+  return false;
+}
+
 export async function killTmuxSession(sessionName: string): Promise<boolean> {
+  const reply = await control.send(`kill-session -t ${tmuxQuote(sessionName)}`);
+  if (reply) return reply.ok;
   return new Promise((resolve) => {
     const child = spawn('tmux', ['kill-session', '-t', sessionName], { stdio: ['ignore', 'ignore', 'ignore'] });
     child.on('exit', (code) => resolve(code === 0));
@@ -60,7 +212,73 @@ export async function killTmuxSession(sessionName: string): Promise<boolean> {
   });
 }
 
+export async function listTmuxSessions(): Promise<Set<string>> {
+  const reply = await control.send("list-sessions -F '#{session_name}'");
+  if (reply) {
+    return new Set(reply.ok ? reply.output.split('\n').filter(Boolean) : []);
+  }
+  return new Promise((resolve) => {
+    const child = spawn('tmux', ['list-sessions', '-F', '#{session_name}'], { stdio: ['ignore', 'pipe', 'ignore'] });
+    let stdout = '';
+    child.stdout?.on('data', (d) => (stdout += String(d)));
+    child.on('exit', (code) => resolve(new Set(code === 0 ? stdout.split('\n').filter(Boolean) : [])));
+    child.on('error', () => resolve(new Set()));
+  });
+}
+
+// Capture several sessions' panes at once. Over the control client this
+// pipelines the capture-pane commands down the one connection; the spawn
+// fallback chains them into a single tmux invocation with ';' separators and
+// sentinel display-message markers, so either way N captures cost at most one
+// fork instead of N.
+export async function captureTmuxSessionsOutput(sessionNames: string[]): Promise<Record<string, string>> {
+  const outputs: Record<string, string> = {};
+  if (sessionNames.length === 0) return outputs;
+  const replies = await Promise.all(sessionNames.map((name) => control.send(`capture-pane -t ${tmuxQuote(name)} -p`)));
+  if (replies.every((reply) => reply !== null)) {
+    sessionNames.forEach((name, i) => {
+      const reply = replies[i]!;
+      outputs[name] = reply.ok ? reply.output : `Error capturing output: ${reply.output}`;
+    });
+    return outputs;
+  }
+  return captureSessionsViaSpawn(sessionNames);
+}
+
+function captureSessionsViaSpawn(sessionNames: string[]): Promise<Record<string, string>> {
+  return new Promise((resolve) => {
+    const args: string[] = [];
+    for (const name of sessionNames) {
+      if (args.length > 0) args.push(';');
+      args.push('capture-pane', '-t', name, '-p', ';', 'display-message', '-p', `---END:${name}---`);
+    }
+    const child = spawn('tmux', args, { stdio: ['ignore', 'pipe', 'ignore'] });
+    let stdout = '';
+    child.stdout?.on('data', (d) => (stdout += String(d)));
+    const finish = () => {
+      const outputs: Record<string, string> = {};
+      let current: string[] = [];
+      for (const line of stdout.split('\n')) {
+        const marker = line.match(/^---END:(.*)---$/);
+        if (marker) {
+          outputs[marker[1]] = current.join('\n');
+          current = [];
+        } else {
+          current.push(line);
+        }
+      }
+      resolve(outputs);
+    };
+    child.on('exit', finish);
+    child.on('error', () => resolve({}));
+  });
+}
+
 export async function getTmuxSessionOutput(sessionName: string): Promise<string> {
+  const reply = await control.send(`capture-pane -t ${tmuxQuote(sessionName)} -p`);
+  if (reply) {
+    return reply.ok ? reply.output : `Error capturing output: ${reply.output}`;
+  }
   return new Promise((resolve) => {
     const child = spawn('tmux', ['capture-pane', '-t', sessionName, '-p']);
     let stdout = '';
@@ -74,5 +292,3 @@ export async function getTmuxSessionOutput(sessionName: string): Promise<string>
     child.on('error', (err) => resolve(`Exception capturing output: ${String(err)}`));
   });
 }
-
-
@@ -1,6 +1,7 @@
+import fs from 'fs';
 import path from 'path';
 import { getEnv } from '../types/env.js';
-import { ensureDir, fileExists, readJsonFile, writeJsonFile } from './fs.js';
+import { ensureDir, fileExists, readJsonFile, withFileLock, writeJsonFile } from './fs.js';
 import { expandPath } from './pathutil.js';
 
 export interface GlobalRegistry {
@@ -25,26 +26,64 @@ export function taskWorkspace(taskId: string): string {
   return path.join(resolveWorkspaceBase(), taskId);
 }
 
+// Bases already initialized this process; lets repeat calls skip the
+// mkdir + registry stat entirely
+const readyBases = new Set<string>();
+
 export async function ensureWorkspace(): Promise<string> {
   const base = resolveWorkspaceBase();
+  if (readyBases.has(base)) return base;
   await ensureDir(path.join(base, 'registry'));
   const globalPath = path.join(base, 'registry', 'GLOBAL_REGISTRY.json');
   if (!(await fileExists(globalPath))) {
-    const initial: GlobalRegistry = {
-      created_at: new Date().toISOString(),
-      total_tasks: 0,
-      active_tasks: 0,
-      total_agents_spawned: 0,
-      active_agents: 0,
-      max_concurrent_agents: Number(process.env.codex_ORCHESTRATOR_MAX_CONCURRENT ?? '8'),
-      tasks: {},
-      agents: {},
-    };
-    await writeJsonFile(globalPath, initial);
+    await withFileLock(globalPath, async () => {
+      if (await fileExists(globalPath)) return;
+      const initial: GlobalRegistry = {
+        created_at: new Date().toISOString(),
+        total_tasks: 0,
+        active_tasks: 0,
+        total_agents_spawned: 0,
+        active_agents: 0,
+        max_concurrent_agents: Number(process.env.codex_ORCHESTRATOR_MAX_CONCURRENT ?? '8'),
+        tasks: {},
+        agents: {},
+      };
+      await writeJsonFile(globalPath, initial);
+    });
   }
+  readyBases.add(base);
   return base;
 }
 
+// Ephemeral spawn artifacts (agent prompt files) are read exactly once by the
+// launched session and never again, so they go to tmpfs when one is available
+// instead of the disk-backed workspace. undefined = not probed yet, null =
+// no usable tmpfs (e.g. Darwin) - callers then fall back to the workspace.
+let ephemeralBase: string | null | undefined;
+
+export function resolveEphemeralDir(taskId: string, workspace: string): string {
+  if (ephemeralBase === undefined) {
+    const env = getEnv();
+    const configured = env.codex_EPHEMERAL_DIR?.trim();
+    const base = configured ? path.resolve(expandPath(configured)) : '/dev/shm/codex_orchestrator';
+    try {
+      // /dev/shm is world-writable, so a fixed base another user pre-created
+      // (or symlinked elsewhere) could expose or swap agent prompt files.
+      // Create it private, refuse anything that is not a directory we own,
+      // and tighten the mode on reuse since mkdir only applies it on creation.
+      fs.mkdirSync(base, { recursive: true, mode: 0o700 });
+      const st = fs.lstatSync(base);
+      const uid = typeof process.getuid === 'function' ? process.getuid() : st.uid;
+      if (!st.isDirectory() || st.uid !== uid) throw new Error(`untrusted ephemeral dir: ${base}`);
+      if ((st.mode & 0o077) !== 0) fs.chmodSync(base, 0o700);
+      ephemeralBase = base;
+    } catch {
+      ephemeralBase = null;
+    }
+  }
+  return ephemeralBase ? path.join(ephemeralBase, taskId) : workspace;
+}
+
 export async function resolveTaskWorkspace(taskId: string): Promise<{ workspace: string; registryPath: string }>{
   const base = resolveWorkspaceBase();
   const workspace = path.join(base, taskId);